@@ -0,0 +1,214 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from analysisengine import time_of_day_segments
+from contactlabels import to_analysis_frame
+from getimessages import EXPORT_COLUMNS, attach_contacts, build_export_query, connect_readonly, iter_batches, read_watermark
+
+# Location of the aggregate store
+store_path = 'imessage_aggregates.sqlite'
+# Bump when the stored counts would be computed differently; older stores are emptied and rebuilt
+SCHEMA_VERSION = 2
+COUNT_TABLES = ['daily', 'minute_of_day', 'chat_counts', 'sender_chat', 'dm_counts']
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+    -- Messages per calendar day, split by sent (1) / received (0)
+    CREATE TABLE IF NOT EXISTS daily (day TEXT NOT NULL, sent INTEGER NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (day, sent));
+    -- Messages per minute of the day (0-1439), split by sent / received
+    CREATE TABLE IF NOT EXISTS minute_of_day (minute INTEGER NOT NULL, sent INTEGER NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (minute, sent));
+    -- Messages per chat name, split by group chat flag and sent / received
+    CREATE TABLE IF NOT EXISTS chat_counts (chat TEXT NOT NULL, is_group INTEGER NOT NULL, sent INTEGER NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (chat, is_group, sent));
+    -- Messages per sender per chat name, split by group chat flag
+    CREATE TABLE IF NOT EXISTS sender_chat (sender TEXT NOT NULL, chat TEXT NOT NULL, is_group INTEGER NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (sender, chat, is_group));
+    -- Direct messages per contact
+    CREATE TABLE IF NOT EXISTS dm_counts (contact TEXT PRIMARY KEY, count INTEGER NOT NULL);
+'''
+
+class AggregateStore:
+    """Persistent, mergeable message counts that the charts can be drawn from without raw rows.
+
+    Every table holds plain counts, so new messages are folded in with an upsert that adds to
+    the existing totals. A daily refresh therefore only touches that day's messages, and the
+    read methods mirror analysisengine.MessageAnalysis so charts.py can use either.
+    """
+
+    def __init__(self, path=store_path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or row[0] != SCHEMA_VERSION:
+            self._reset()
+
+    def _reset(self):
+        """Empty every count table and the ROWID watermark, so the next update recounts all of chat.db."""
+        with self.conn:
+            for table in COUNT_TABLES:
+                self.conn.execute(f'DELETE FROM {table}')
+            self.conn.execute('DELETE FROM meta')
+            self.conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (SCHEMA_VERSION,))
+
+    def close(self):
+        self.conn.close()
+
+    def _upsert(self, table, keys, counts):
+        """Add a Series of counts (indexed by the key columns) onto a table's existing counts."""
+        if counts.empty:
+            return
+        columns = ', '.join(keys)
+        placeholders = ', '.join('?' * (len(keys) + 1))
+        # Plain Python values, since sqlite3 cannot bind NumPy integers
+        rows = [
+            (*(k.item() if isinstance(k, np.generic) else k for k in (key if isinstance(key, tuple) else (key,))), int(count))
+            for key, count in counts.items()
+        ]
+        self.conn.executemany(
+            f'INSERT INTO {table} ({columns}, count) VALUES ({placeholders}) '
+            f'ON CONFLICT ({columns}) DO UPDATE SET count = count + excluded.count',
+            rows,
+        )
+
+    def update(self, messages):
+        """Fold a frame of new messages (analysis layout, see labelmessages.py) into the stored counts."""
+        with self.conn:
+            self._fold(messages)
+
+    def _fold(self, messages):
+        """Add a frame's counts to the tables inside the caller's transaction."""
+        times = pd.DatetimeIndex(messages['Readable Time'])
+        chat_names = messages['Group Chat Name'].astype(object)
+        keys = pd.DataFrame({
+            'day': times.strftime('%Y-%m-%d'),
+            'minute': times.hour * 60 + times.minute,
+            'sent': messages['Sent by Me'].fillna(0).astype(int).to_numpy(),
+            'is_group': messages['Group Chat'].fillna(0).astype(int).to_numpy(),
+            'chat': chat_names.where(chat_names != '').to_numpy(),
+            'sender': messages['Sender'].astype(object).to_numpy(),
+            'to': messages['To'].astype(object).to_numpy(),
+        })
+
+        # groupby drops missing chat/sender keys, so only named chats and senders are counted
+        # ('' is the name chat.db gives DMs and unnamed group chats)
+        self._upsert('daily', ['day', 'sent'], keys.groupby(['day', 'sent']).size())
+        self._upsert('minute_of_day', ['minute', 'sent'], keys.groupby(['minute', 'sent']).size())
+        self._upsert('chat_counts', ['chat', 'is_group', 'sent'], keys.groupby(['chat', 'is_group', 'sent']).size())
+        self._upsert('sender_chat', ['sender', 'chat', 'is_group'], keys.groupby(['sender', 'chat', 'is_group']).size())
+        self._upsert('dm_counts', ['contact'], keys.loc[keys['is_group'] == 0, 'to'].value_counts())
+
+    def update_from_chat_db(self, db_path, contacts=None, batch_size=50000):
+        """Fold only the messages added to chat.db since the last update into the store.
+
+        The highest message ROWID already counted is kept in the store itself, so each run
+        reads just the new rows. All batches and the new ROWID are committed in one transaction,
+        so an interrupted run leaves the store unchanged. Returns the number of messages added.
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_rowid'").fetchone()
+        last_rowid = row[0] if row else 0
+
+        conn = connect_readonly(db_path)
+        attach_contacts(conn, contacts or {})
+        current = read_watermark(conn)
+        cursor = conn.execute(build_export_query(labeled=True), (last_rowid, current['last_rowid']))
+
+        total_rows = 0
+        with self.conn:
+            for rows in iter_batches(cursor, batch_size):
+                self._fold(to_analysis_frame(pd.DataFrame.from_records(rows, columns=EXPORT_COLUMNS)))
+                total_rows += len(rows)
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_rowid', ?)", (current['last_rowid'],))
+        conn.close()
+        return total_rows
+
+    def _read(self, query, params=()):
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    def _interval_counts(self, sent, groupingsize):
+        """Daily counts for sent (1) or received (0) messages summed into groupingsize-day intervals."""
+        daily = self._read('SELECT day, count FROM daily WHERE sent = ? ORDER BY day', (sent,))
+        daily_counts = pd.Series(daily['count'].to_numpy(), index=pd.to_datetime(daily['day']))
+        return daily_counts.resample(f'{groupingsize}D').sum()
+
+    def lifetime_activity(self, groupingsize=10):
+        """Sent, received and total message counts in groupingsize-day intervals."""
+        activity_df = pd.DataFrame({'Sent': self._interval_counts(1, groupingsize), 'Received': self._interval_counts(0, groupingsize)}).fillna(0)
+        activity_df['Total'] = activity_df['Sent'] + activity_df['Received']
+        return activity_df
+
+    def sent_activity(self, groupingsize=10):
+        """Sent message counts in groupingsize-day intervals."""
+        return self._interval_counts(1, groupingsize).to_frame('Sent')
+
+    def time_of_day_activity(self, timegroup=20):
+        """Sent, received and total message counts for every timegroup-minute segment of the day."""
+        minutes = self._read('SELECT minute, sent, count FROM minute_of_day')
+        minutes['segment'] = minutes['minute'] // timegroup * timegroup
+        counts = minutes.pivot_table(index='segment', columns='sent', values='count', aggfunc='sum', fill_value=0)
+        # Every segment of the day, including empty ones, as in the engine
+        counts = counts.reindex(index=range(0, 24 * 60, timegroup), columns=[1, 0], fill_value=0)
+        activity = pd.DataFrame({'Sent': counts[1].to_numpy(), 'Received': counts[0].to_numpy()}, index=time_of_day_segments(timegroup))
+        activity['Total'] = activity['Sent'] + activity['Received']
+        return activity
+
+    def top_group_chats(self, topnumGC=30):
+        """The topnumGC group chats by number of messages."""
+        counts = self._read('''
+            SELECT chat AS "Group Chat Name", SUM(count) AS "Number of Messages" FROM chat_counts
+            WHERE is_group = 1 GROUP BY chat ORDER BY 2 DESC LIMIT ?''', (topnumGC,))
+        return counts.set_index('Group Chat Name')
+
+    def participation_rates(self, topnumGC=30, all_chats=False):
+        """Share of each group chat's messages sent by me, highest first."""
+        rates = self._read('''
+            SELECT chat AS "Group Chat Name", CAST(SUM(count * sent) AS REAL) / SUM(count) AS "Participation Rate"
+            FROM chat_counts GROUP BY chat''').set_index('Group Chat Name')['Participation Rate']
+        if all_chats:
+            names = self._read('SELECT DISTINCT chat FROM chat_counts WHERE is_group = 1')['chat']
+        else:
+            names = self.top_group_chats(topnumGC).index
+        participation_df = rates.reindex(names, fill_value=0).rename('Participation Rate').rename_axis('Group Chat Name').reset_index()
+        return participation_df.sort_values(by='Participation Rate', ascending=False)
+
+    def top_dm_contacts(self, contactstolookat=30):
+        """The contactstolookat contacts by number of direct messages."""
+        counts = self._read('SELECT contact AS "Contact", count AS "Total Messages" FROM dm_counts ORDER BY count DESC LIMIT ?', (contactstolookat,))
+        return counts.set_index('Contact')
+
+    def total_interactions(self, contactstolookat=30):
+        """The contactstolookat contacts by DMs plus group chat messages from them and from me in their chats."""
+        counts = self._read('''
+            WITH me_chat AS (
+                SELECT chat, SUM(count) AS count FROM sender_chat WHERE sender = 'Me' GROUP BY chat
+            ), contact_gc AS (
+                SELECT sender, SUM(sender_chat.count) AS from_contact, SUM(COALESCE(me_chat.count, 0)) AS from_me
+                FROM sender_chat LEFT JOIN me_chat USING (chat)
+                WHERE is_group = 1 GROUP BY sender
+            )
+            SELECT dm_counts.contact AS "Contact",
+                   dm_counts.count + COALESCE(contact_gc.from_contact, 0) + COALESCE(contact_gc.from_me, 0) AS "Total Messages"
+            FROM dm_counts LEFT JOIN contact_gc ON contact_gc.sender = dm_counts.contact
+            ORDER BY 2 DESC LIMIT ?''', (contactstolookat,))
+        return counts.set_index('Contact')
+
+    def group_chat_senders(self, targetGC):
+        """Number of messages each person sent in one group chat."""
+        counts = self._read('''
+            SELECT sender AS "Sender", SUM(count) AS "Number of Messages" FROM sender_chat
+            WHERE chat = ? GROUP BY sender ORDER BY 2 DESC''', (targetGC,))
+        return counts.set_index('Sender')
+
+if __name__ == '__main__':
+    from contactcache import load_cached_contacts
+    from report import render_report
+
+    db_path = r'/Users/landon/Library/Messages/chat.db'
+    vcf_file = r"/Users/landon/Downloads/Fuller Adams and 290 others.vcf"
+    report_dir = 'report'
+
+    # Fold in only the messages added since the last run, then draw the charts from the counts
+    store = AggregateStore(store_path)
+    added = store.update_from_chat_db(db_path, load_cached_contacts(vcf_file).contacts if vcf_file else None)
+    print(f"{added} new messages added to {store_path}")
+    print(f"Report written to {render_report(store, report_dir)}")
+    store.close()
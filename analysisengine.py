@@ -0,0 +1,204 @@
+import datetime
+import functools
+import numpy as np
+import pandas as pd
+from contactindex import ContactIndex
+from messageio import read_messages
+
+def memoized(method):
+    """Cache a method's result on the instance, keyed by its arguments."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in self._cache:
+            self._cache[key] = method(self, *args, **kwargs)
+        return self._cache[key]
+    return wrapper
+
+# The only columns the analyses read; Message text is never loaded
+ENGINE_COLUMNS = ['Readable Time', 'Sender', 'To', 'Group Chat', 'Group Chat Name', 'Sent by Me']
+
+def count_values(series):
+    """value_counts that leaves out categories with no rows, so categorical and object columns count alike."""
+    counts = series.value_counts()
+    return counts[counts > 0]
+
+def time_of_day_segments(timegroup):
+    """Start of every timegroup-minute segment of the day, as datetime.time labels."""
+    return [datetime.time(minute // 60, minute % 60) for minute in range(0, 24 * 60, timegroup)]
+
+class MessageAnalysis:
+    """Loads a labeled message export once and answers every analysis from shared indexes.
+
+    Each analysis method returns a DataFrame and is memoized, so charts, dashboards and
+    benchmarks can call them repeatedly without re-scanning the messages. With a ContactIndex
+    built from the same export, person_activity reads its rows from the index instead.
+    """
+
+    def __init__(self, messages, contact_index=None):
+        self.messages = messages.reset_index(drop=True)
+        self._cache = {}
+        if contact_index is not None and contact_index.rows != len(self.messages):
+            raise ValueError("The contact index was built from a different export; rebuild it with contactindex.py")
+        self.contact_index = contact_index
+
+        # Row masks reused by every analysis instead of re-filtering the frame
+        self.times = pd.DatetimeIndex(self.messages['Readable Time'])
+        self.sent_mask = (self.messages['Sent by Me'] == 1).to_numpy()
+        self.received_mask = (self.messages['Sent by Me'] == 0).to_numpy()
+        self.group_mask = (self.messages['Group Chat'] == 1).to_numpy()
+        self.individual_mask = (self.messages['Group Chat'] == 0).to_numpy()
+
+        # Row positions for each chat, sender and DM contact
+        self.chat_rows = self.messages.groupby('Group Chat Name', sort=False, observed=True).indices
+        self.sender_rows = self.messages.groupby('Sender', sort=False, observed=True).indices
+        self.to_rows = self.messages.groupby('To', sort=False, observed=True).indices
+
+        # Minute of the day (0-1439) each message was sent at, -1 where the time is missing
+        self.minute_of_day = (self.times.hour * 60 + self.times.minute).fillna(-1).to_numpy(dtype=np.int16)
+
+    @classmethod
+    def from_file(cls, path, contact_index_dir=None):
+        """Load the columns the analyses need from a message export (CSV or Parquet) and build the engine on it."""
+        contact_index = ContactIndex.load(contact_index_dir) if contact_index_dir else None
+        return cls(read_messages(path, columns=ENGINE_COLUMNS), contact_index)
+
+    def uncached(self, method_name, *args, **kwargs):
+        """Run an analysis method without storing its result, for one-off calls like per-entity reports."""
+        return getattr(type(self), method_name).__wrapped__(self, *args, **kwargs)
+
+    def _rows(self, index, key):
+        """Row positions for a key in one of the per-chat/sender/contact indexes."""
+        return index.get(key, np.array([], dtype=np.intp))
+
+    def _resample_counts(self, selector, groupingsize, origin='start_day'):
+        """Count the selected messages in groupingsize-day intervals."""
+        return pd.Series(1, index=self.times[selector]).resample(f'{groupingsize}D', origin=origin).size()
+
+    @memoized
+    def lifetime_activity(self, groupingsize=10):
+        """Sent, received and total message counts in groupingsize-day intervals."""
+        sent_counts = self._resample_counts(self.sent_mask, groupingsize)
+        rec_counts = self._resample_counts(self.received_mask, groupingsize)
+        activity_df = pd.DataFrame({'Sent': sent_counts, 'Received': rec_counts}).fillna(0)
+        activity_df['Total'] = activity_df['Sent'] + activity_df['Received']
+        return activity_df
+
+    @memoized
+    def sent_activity(self, groupingsize=10):
+        """Sent message counts in groupingsize-day intervals, over the span of sent messages only."""
+        return self._resample_counts(self.sent_mask, groupingsize).to_frame('Sent')
+
+    @memoized
+    def time_of_day_activity(self, timegroup=20):
+        """Sent, received and total message counts for every timegroup-minute segment of the day.
+
+        Segments with no messages are included as zeros so the charts always span the whole day.
+        """
+        segments = time_of_day_segments(timegroup)
+        has_time = self.minute_of_day >= 0
+
+        # Code each message as segment * 3 + (0 sent, 1 received, 2 other) and count all variants in one bincount
+        kind = np.where(self.sent_mask, 0, np.where(self.received_mask, 1, 2))
+        codes = (self.minute_of_day[has_time].astype(np.intp) // timegroup) * 3 + kind[has_time]
+        counts = np.bincount(codes, minlength=len(segments) * 3).reshape(len(segments), 3)
+
+        return pd.DataFrame({'Sent': counts[:, 0], 'Received': counts[:, 1], 'Total': counts.sum(axis=1)}, index=segments)
+
+    @memoized
+    def top_group_chats(self, topnumGC=30):
+        """The topnumGC group chats by number of messages."""
+        group_chat_counts = count_values(self.messages.loc[self.group_mask, 'Group Chat Name']).head(topnumGC)
+        return group_chat_counts.rename('Number of Messages').rename_axis('Group Chat Name').to_frame()
+
+    @memoized
+    def participation_rates(self, topnumGC=30, all_chats=False):
+        """Share of each group chat's messages sent by me, highest first.
+
+        Covers the topnumGC chats by volume, or every group chat with all_chats=True.
+        """
+        chat_names = self.messages['Group Chat Name']
+
+        # Count total and sent messages for every chat in one pass each
+        gc_total_counts = count_values(chat_names)
+        gc_sent_counts = count_values(chat_names[self.sent_mask]).reindex(gc_total_counts.index, fill_value=0)
+
+        # Calculate participation rate as sent messages / total messages
+        rates = (gc_sent_counts / gc_total_counts).fillna(0)
+
+        if all_chats:
+            names = chat_names[self.group_mask].dropna().unique()
+        else:
+            names = self.top_group_chats(topnumGC).index
+        participation_df = rates.reindex(names, fill_value=0).rename('Participation Rate').rename_axis('Group Chat Name').reset_index()
+        return participation_df.sort_values(by='Participation Rate', ascending=False)
+
+    @memoized
+    def top_dm_contacts(self, contactstolookat=30):
+        """The contactstolookat contacts by number of direct messages."""
+        contact_counts = count_values(self.messages.loc[self.individual_mask, 'To']).head(contactstolookat)
+        return contact_counts.rename('Total Messages').rename_axis('Contact').to_frame()
+
+    @memoized
+    def total_interactions(self, contactstolookat=30):
+        """The contactstolookat contacts by DMs plus group chat messages from them and from me in their chats."""
+        messages = self.messages
+        group_chats = messages[self.group_mask]
+        dm_counts = count_values(messages.loc[self.individual_mask, 'To'])
+
+        # Calculate the group chat messages sent by each contact
+        group_chat_counts = count_values(group_chats['Sender'])
+
+        # Every (contact, group chat) pair the contact has sent a message in
+        contact_chat_pairs = group_chats[['Sender', 'Group Chat Name']].dropna().drop_duplicates()
+
+        # Count the messages I sent in each chat once, then sum them over each contact's chats
+        me_chat_counts = count_values(messages.loc[messages['Sender'] == "Me", 'Group Chat Name'])
+        group_chat_me_counts = contact_chat_pairs['Group Chat Name'].astype(object).map(me_chat_counts).fillna(0).groupby(contact_chat_pairs['Sender'], observed=True).sum()
+
+        total_interactions = (
+            dm_counts
+            + group_chat_counts.reindex(dm_counts.index, fill_value=0)
+            + group_chat_me_counts.reindex(dm_counts.index, fill_value=0).astype(int)
+        )
+        return total_interactions.rename_axis('Contact').to_frame('Total Messages').nlargest(contactstolookat, 'Total Messages')
+
+    @memoized
+    def group_chat_senders(self, targetGC):
+        """Number of messages each person sent in one group chat."""
+        rows = self._rows(self.chat_rows, targetGC)
+        message_counts_by_sender = count_values(self.messages['Sender'].iloc[rows])
+        return message_counts_by_sender.rename('Number of Messages').rename_axis('Sender').to_frame()
+
+    def _person_rows(self, target):
+        """Rows of the DMs with target, target's group chat messages and my messages in target's group chats."""
+        if self.contact_index is not None:
+            return self.contact_index.person_rows(target)
+
+        # Direct messages with the target
+        dm_rows = self._rows(self.to_rows, target)
+        dm_rows = dm_rows[self.individual_mask[dm_rows]]
+
+        # Group chat messages sent by the target
+        target_rows = self._rows(self.sender_rows, target)
+        target_gc_rows = target_rows[self.group_mask[target_rows]]
+
+        # Messages I sent in the group chats the target has participated in
+        target_group_chats = self.messages['Group Chat Name'].iloc[target_gc_rows].dropna().unique()
+        me_rows = self._rows(self.sender_rows, "Me")
+        me_gc_rows = me_rows[self.messages['Group Chat Name'].iloc[me_rows].isin(target_group_chats).to_numpy()]
+        return dm_rows, target_gc_rows, me_gc_rows
+
+    @memoized
+    def person_activity(self, target, groupingsize=10):
+        """DMs with target and total interactions including shared group chats, in groupingsize-day intervals."""
+        common_start_date = self.times.min()
+        dm_rows, target_gc_rows, me_gc_rows = self._person_rows(target)
+
+        # Group each type of message by the specified interval with a common start date
+        dm_counts = self._resample_counts(dm_rows, groupingsize, origin=common_start_date)
+        group_chat_target_counts = self._resample_counts(target_gc_rows, groupingsize, origin=common_start_date)
+        group_chat_me_counts = self._resample_counts(me_gc_rows, groupingsize, origin=common_start_date)
+
+        total_interactions = dm_counts.add(group_chat_target_counts, fill_value=0).add(group_chat_me_counts, fill_value=0)
+        return pd.DataFrame({'DM': dm_counts, 'Total': total_interactions})
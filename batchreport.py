@@ -0,0 +1,110 @@
+import collections
+import csv
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import charts
+from analysisengine import MessageAnalysis
+from contactindex import ContactIndex
+from report import render_chart, write_index
+
+messages_location = r"c:\Users\lndnc\Downloads\cleanedimessages.csv"
+# Optional index from contactindex.py; without one the same index is built in memory at start
+contact_index_dir = None
+output_dir = 'entity_reports'
+# Any matplotlib savefig formats, e.g. ('png', 'svg')
+formats = ('png',)
+# Worker processes used to render charts (None = one per CPU)
+workers = None
+
+# Only the top_n group chats (by messages) and contacts (by DMs); None reports on every one
+top_n = None
+groupingsize = 10
+
+def entity_filename(kind, number, name):
+    """File name stem for one entity's outputs that is safe on every filesystem and unique per entity."""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', str(name)).strip('_')[:60] or 'unnamed'
+    return f'{kind}-{number:05d}-{slug}'
+
+def group_chat_sender_counts(engine):
+    """Messages per sender for every group chat, from one groupby over the group chat messages."""
+    group_messages = engine.messages.loc[engine.group_mask, ['Group Chat Name', 'Sender']]
+    counts = group_messages.groupby(['Group Chat Name', 'Sender'], observed=True, sort=False).size()
+    return {
+        chat: chat_counts.droplevel(0).sort_values(ascending=False).rename('Number of Messages')
+        for chat, chat_counts in counts.groupby(level=0, observed=True, sort=False)
+    }
+
+def entity_jobs(engine, top_n=None, groupingsize=groupingsize):
+    """Yield (kind, name, file stem, plot function, args, table) for every group chat and contact, lazily.
+
+    Group chats and contacts are each split from the messages in one grouped pass (the contact
+    index is built in memory if the engine has none), so every person timeline only reads that
+    person's rows. Timelines are computed one at a time while earlier entities are being drawn.
+    """
+    if engine.contact_index is None:
+        engine.contact_index = ContactIndex.from_messages(engine.messages)
+    sender_counts = group_chat_sender_counts(engine)
+    chats = engine.top_group_chats(top_n or max(len(sender_counts), 1)).index
+    for number, chat in enumerate(chats):
+        counts = sender_counts.get(chat)
+        if counts is None or not len(counts):
+            continue
+        yield ('group_chat', chat, entity_filename('group_chat', number, chat),
+               charts.plot_group_chat_senders, (counts, chat), counts.rename_axis('Sender').to_frame())
+
+    contacts = engine.top_dm_contacts(top_n or max(len(engine.to_rows), 1)).index
+    for number, contact in enumerate(contacts):
+        # Each timeline is only needed once, so it is not kept in the engine's cache
+        person_df = engine.uncached('person_activity', contact, groupingsize)
+        yield ('contact', contact, entity_filename('contact', number, contact),
+               charts.plot_person_activity, (person_df, contact, groupingsize), person_df)
+
+def render_entity(filename, plot_function, args, table, output_dir, formats):
+    """Save one entity's result table as CSV and its chart in each format, returning the file names."""
+    table.to_csv(os.path.join(output_dir, filename + '.csv'), encoding='utf-8')
+    return render_chart(filename, plot_function, args, output_dir, formats) + [filename + '.csv']
+
+def bounded_results(pool, jobs, output_dir, formats, window):
+    """Submit render jobs keeping at most window in flight and yield (job, file names) in submission order."""
+    pending = collections.deque()
+    for job in jobs:
+        _, _, filename, plot_function, args, table = job
+        pending.append((job, pool.submit(render_entity, filename, plot_function, args, table, output_dir, formats)))
+        if len(pending) >= window:
+            job, future = pending.popleft()
+            yield job, future.result()
+    while pending:
+        job, future = pending.popleft()
+        yield job, future.result()
+
+def render_entity_reports(engine, output_dir=output_dir, formats=formats, workers=workers, top_n=top_n):
+    """Render a chart and table for every group chat and contact in worker processes.
+
+    Entities are produced lazily and only a few per worker are queued at a time, so memory stays
+    flat with thousands of entities. Each finished entity is appended to manifest.csv straight
+    away, and index.html links them all at the end. Returns the number of entities rendered.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rendered = []
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(os.path.join(output_dir, 'manifest.csv'), 'w', newline='', encoding='utf-8') as manifest:
+        writer = csv.writer(manifest)
+        writer.writerow(['Kind', 'Name', 'Files'])
+        window = 4 * (workers or os.cpu_count() or 1)
+        for (kind, name, _, _, _, _), filenames in bounded_results(pool, entity_jobs(engine, top_n), output_dir, formats, window):
+            writer.writerow([kind, name, ' '.join(filenames)])
+            manifest.flush()
+            title = f'Senders in {name}' if kind == 'group_chat' else f'Activity with {name}'
+            rendered.append((title, filenames))
+
+    write_index(output_dir, rendered)
+    return len(rendered)
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    engine = MessageAnalysis.from_file(messages_location, contact_index_dir)
+    count = render_entity_reports(engine, output_dir, formats, workers, top_n)
+    print(f"{count} group chat and contact reports written to {output_dir} in {time.perf_counter() - start:.1f}s")
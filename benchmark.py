@@ -0,0 +1,127 @@
+import json
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from analysisengine import MessageAnalysis
+from contactlabels import label_handles, to_analysis_frame
+from getimessages import export_messages
+from messageio import read_messages, write_messages
+from pipeline import peak_memory_mb
+from synthchatdb import generate_chat_db, generate_vcf
+from vcfparse import card_offsets, parse_vcf
+
+# Message counts to benchmark at; each scale's synthetic chat.db is generated once and reused
+scales = [10_000, 100_000, 1_000_000, 10_000_000]
+contacts = 500
+group_chats = 60
+bench_dir = 'bench'
+
+def scale_paths(scale):
+    """Input and intermediate file paths for one scale."""
+    prefix = os.path.join(bench_dir, f'{scale}')
+    return {
+        'db': prefix + '_chat.db',
+        'vcf': os.path.join(bench_dir, f'contacts_{contacts}.vcf'),
+        'export': prefix + '_export.csv',
+        'state': prefix + '_export.state.json',
+        'labeled': prefix + '_labeled.csv',
+    }
+
+def measured(function, *args):
+    """Run function in this (fresh) process and return its result with wall time and peak memory."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start, peak_memory_mb()
+
+def isolated(function, *args):
+    """Run function in its own worker process so its peak memory is not mixed with other stages."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(measured, function, *args).result()
+
+def export_stage(paths):
+    return export_messages(paths['db'], paths['export'], state_file=paths['state'])
+
+def contacts_stage(paths):
+    return len(parse_vcf(paths['vcf']))
+
+def label_stage(paths):
+    """labelmessages.py's work: load the export, label both handle columns, write the labeled file."""
+    contacts = {phone: full_name for _, _, full_name, phone in parse_vcf(paths['vcf'])}
+    messages = read_messages(paths['export'])
+    label_handles(messages, ['Sender', 'Contact Identifier'], contacts)
+    write_messages(to_analysis_frame(messages), paths['labeled'])
+    return len(messages)
+
+def analysis_stage(paths):
+    """Load the engine and time each analysis section on its own."""
+    sections = {}
+    start = time.perf_counter()
+    engine = MessageAnalysis.from_file(paths['labeled'])
+    sections['load'] = time.perf_counter() - start
+
+    top_contact = engine.top_dm_contacts(1).index[0] if len(engine.top_dm_contacts(1)) else ''
+    top_chat = engine.top_group_chats(1).index[0] if len(engine.top_group_chats(1)) else ''
+    engine._cache.clear()
+    calls = {
+        'lifetime_activity': lambda: engine.lifetime_activity(10),
+        'time_of_day_activity': lambda: engine.time_of_day_activity(20),
+        'top_group_chats': lambda: engine.top_group_chats(30),
+        'participation_rates': lambda: engine.participation_rates(30, True),
+        'top_dm_contacts': lambda: engine.top_dm_contacts(30),
+        'total_interactions': lambda: engine.total_interactions(30),
+        'group_chat_senders': lambda: engine.group_chat_senders(top_chat),
+        'person_activity': lambda: engine.person_activity(top_contact, 10),
+    }
+    for name, call in calls.items():
+        start = time.perf_counter()
+        call()
+        sections[name] = time.perf_counter() - start
+    return sections
+
+STAGES = [('export', export_stage), ('contacts', contacts_stage), ('label', label_stage), ('analysis', analysis_stage)]
+
+def run_benchmarks(scales=scales):
+    """Time every stage at every scale and return the results as a JSON-ready dict."""
+    os.makedirs(bench_dir, exist_ok=True)
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'contacts': contacts,
+        'group_chats': group_chats,
+        'scales': {},
+    }
+    for scale in scales:
+        paths = scale_paths(scale)
+        if not os.path.exists(paths['vcf']):
+            generate_vcf(paths['vcf'], contacts)
+        if not os.path.exists(paths['db']):
+            print(f"Generating synthetic chat.db with {scale:,} messages")
+            generate_chat_db(paths['db'], messages=scale, contacts=contacts, group_chats=group_chats)
+
+        # The contacts stage parses the vCard file, so its throughput is in cards rather than messages
+        cards = len(card_offsets(paths['vcf']))
+
+        scale_results = {}
+        for name, stage in STAGES:
+            result, seconds, peak = isolated(stage, paths)
+            count, unit, key = (cards, 'cards', 'cards_per_second') if name == 'contacts' else (scale, 'msgs', 'rows_per_second')
+            rate = round(count / seconds) if seconds else None
+            scale_results[name] = {'seconds': round(seconds, 4), 'peak_memory_mb': peak and round(peak, 1), key: rate}
+            if name == 'analysis':
+                scale_results[name]['sections'] = {section: round(s, 4) for section, s in result.items()}
+            print(f"{scale:>12,} {name:>9}: {seconds:8.2f}s  {rate or 0:>14,} {unit:>4}/s  peak {peak or 0:,.0f} MB")
+        results['scales'][str(scale)] = scale_results
+    return results
+
+if __name__ == '__main__':
+    results = run_benchmarks(scales)
+    results_path = os.path.join(bench_dir, f"results-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {results_path}")
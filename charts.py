@@ -0,0 +1,141 @@
+import matplotlib.pyplot as plt
+
+# Each function draws one chart from an analysis result and returns the figure without
+# showing it, so analysis.py can plt.show() it and report.py can save it headlessly.
+
+def plot_lifetime_activity(activity_df, groupingsize):
+    """Line chart of sent, received and total messages over time."""
+    fig = plt.figure(figsize=(12, 6))
+    plt.plot(activity_df.index, activity_df['Sent'], label='Sent Messages', color='blue')
+    plt.plot(activity_df.index, activity_df['Received'], label='Received Messages', color='orange')
+    plt.plot(activity_df.index, activity_df['Total'], label='Total Messages', color='green')
+    plt.xlabel('Date')
+    plt.ylabel('Number of Messages')
+    plt.title(f'Lifetime Activity: Messages Sent, Received, and Total in {groupingsize}-Day Intervals')
+    plt.legend()
+    plt.tight_layout()
+    return fig
+
+def plot_sent_activity(sent_counts, groupingsize):
+    """Line chart of sent messages over time with an average line."""
+    average_sent = sent_counts.mean()
+
+    fig = plt.figure(figsize=(12, 6))
+    plt.plot(sent_counts.index, sent_counts, label='Sent Messages', color='blue')
+    plt.axhline(average_sent, color='red', linestyle='--', label=f'Average ({average_sent:.2f})')
+    plt.xlabel('Date')
+    plt.ylabel('Number of Sent Messages')
+    plt.title(f'Total Messages Sent in {groupingsize}-Day Intervals')
+    plt.legend()
+    plt.tight_layout()
+    return fig
+
+def plot_time_of_day_sent_received(time_activity, timegroup):
+    """Side-by-side bars of sent and received messages per time-of-day segment."""
+    fig, ax = plt.subplots(figsize=(14, 6))
+    time_activity[['Sent', 'Received']].plot(kind='bar', width=0.8, stacked=False, ax=ax)
+    plt.xlabel(f'Time of Day ({timegroup}-minute segments)')
+    plt.ylabel('Number of Messages')
+    plt.title(f'Message Activity by {timegroup}-Minute Segments (Sent vs. Received)')
+    plt.xticks(rotation=90)
+    plt.legend(['Sent', 'Received'])
+    plt.tight_layout()
+    return fig
+
+def plot_time_of_day_total(time_activity, timegroup):
+    """Bars of all messages per time-of-day segment."""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    time_activity['Total'].plot(kind='bar', width=0.8, ax=ax)
+    plt.xlabel(f'Time of Day ({timegroup}-minute segments)')
+    plt.ylabel('Number of Messages')
+    plt.title(f'Message Activity by {timegroup}-Minute Segments')
+    plt.xticks(rotation=90)
+    plt.tight_layout()
+    return fig
+
+def plot_time_of_day_sent(time_activity, timegroup):
+    """Bars of sent messages per time-of-day segment."""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    time_activity['Sent'].plot(kind='bar', width=0.8, ax=ax)
+    plt.xlabel(f'Time of Day ({timegroup}-minute segments)')
+    plt.ylabel('Number of Sent Messages')
+    plt.title(f'Number of Sent Messages by {timegroup}-Minute Segments')
+    plt.xticks(rotation=90)
+    plt.tight_layout()
+    return fig
+
+def plot_participation_rates(participation_df, topnumGC):
+    """Horizontal bars of the group chats with the highest participation rate."""
+    fig = plt.figure(figsize=(15, 8))
+    plt.barh(participation_df['Group Chat Name'], participation_df['Participation Rate'], color='skyblue')
+    plt.xlabel('Participation Rate')
+    plt.ylabel('Group Chat Name')
+    plt.title(f'Top {topnumGC} Group Chats by Participation Rate')
+    plt.gca().invert_yaxis()  # Invert y-axis to have the highest rate at the top
+    plt.tight_layout()
+    return fig
+
+def plot_top_group_chats(group_chat_counts, topnumGC):
+    """Bars of the group chats with the most messages."""
+    fig, ax = plt.subplots(figsize=(14, 6))
+    group_chat_counts.plot(kind='bar', ax=ax)
+    plt.xlabel('Group Chat Name')
+    plt.ylabel('Number of Messages')
+    plt.title(f'Top {topnumGC} Group Chats by Number of Messages')
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    return fig
+
+def plot_top_dm_contacts(contact_counts, contactstolookat):
+    """Horizontal bars of the contacts with the most direct messages."""
+    fig = plt.figure(figsize=(12, 8))
+    plt.barh(contact_counts.index, contact_counts.values, color='skyblue')
+    plt.xlabel('Total Messages')
+    plt.ylabel('Contact')
+    plt.title(f'Top {contactstolookat} Contacts by Total Direct Messages')
+    plt.gca().invert_yaxis()  # Invert y-axis for descending order
+    plt.tight_layout()
+    return fig
+
+def plot_total_interactions(top_contacts, contactstolookat):
+    """Horizontal bars of the contacts with the most interactions including group chats."""
+    fig = plt.figure(figsize=(12, 8))
+    plt.barh(top_contacts.index, top_contacts['Total Messages'], color='skyblue')
+    plt.xlabel('Total Messages')
+    plt.ylabel('Contact')
+    plt.title(f'Top {contactstolookat} Contacts by Total Interactions (includes group chats)')
+    plt.gca().invert_yaxis()  # Invert y-axis for descending order
+    plt.tight_layout()
+    return fig
+
+def format_autopct(pct, all_values):
+    """Format a pie chart label with both percentage and raw count."""
+    absolute = int(round(pct / 100. * sum(all_values)))
+    return f"{pct:.1f}%\n({absolute} msgs)"
+
+def plot_group_chat_senders(message_counts_by_sender, targetGC):
+    """Pie chart of who sent the messages in one group chat."""
+    fig = plt.figure(figsize=(12, 12))
+    plt.pie(
+        message_counts_by_sender,
+        labels=message_counts_by_sender.index,
+        autopct=lambda pct: format_autopct(pct, message_counts_by_sender),
+        startangle=140
+    )
+    plt.title(f'Message Distribution by Sender in Group Chat: {targetGC}')
+    return fig
+
+def plot_person_activity(person_df, target, groupingsize):
+    """Line chart of DMs and total interactions with one person over time."""
+    dm_counts = person_df['DM'].dropna()
+    total_interactions = person_df['Total']
+
+    fig = plt.figure(figsize=(12, 6))
+    plt.plot(dm_counts.index, dm_counts, label=f'DM Messages with {target}', color='blue')
+    plt.plot(total_interactions.index, total_interactions, label=f'Total Interactions with {target} (including groupchats)', color='green', linestyle='--')
+    plt.xlabel('Date')
+    plt.ylabel(f'Number of Messages in {groupingsize}-Day Intervals')
+    plt.title(f'Message Activity with {target} Over Time in {groupingsize}-Day Intervals')
+    plt.legend()
+    plt.tight_layout()
+    return fig
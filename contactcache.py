@@ -0,0 +1,79 @@
+import collections
+import hashlib
+import os
+import pickle
+
+from vcfparse import parse_vcf
+
+# Default location of the parsed-contacts cache
+cache_file = 'contacts_cache.pickle'
+# Bump when the cached rows would be built differently so old caches are ignored
+CACHE_VERSION = 1
+
+CachedContacts = collections.namedtuple('CachedContacts', ['rows', 'contacts', 'cache_hit'])
+
+def file_hash(path):
+    """SHA-256 of a file's contents, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_stat(path):
+    """Size and modification time used as the cheap first check of the cache key."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def read_cache(cache_file):
+    """Load the cache file, or return None if it is missing, unreadable or from another version."""
+    try:
+        with open(cache_file, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return None
+    return cache
+
+def write_cache(cache_file, cache):
+    """Write the cache atomically so an interrupted run never leaves a half-written file."""
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+def load_cached_contacts(vcf_file_path, cache_file=cache_file):
+    """Return CachedContacts(contact rows, phone -> name mapping, cache hit) for a .vcf file.
+
+    The cache is keyed on the file's size, mtime and SHA-256. If size and mtime match the file
+    is not read at all; if only the mtime changed the hash decides. On a miss the file is
+    parsed with vcfparse and the cache is rewritten.
+    """
+    stat = file_stat(vcf_file_path)
+    cache = read_cache(cache_file)
+
+    if cache is not None and cache['source'] == os.path.abspath(vcf_file_path):
+        if cache['stat'] == stat:
+            return CachedContacts(cache['rows'], cache['contacts'], True)
+        digest = file_hash(vcf_file_path)
+        if cache['sha256'] == digest:
+            # Touched but unchanged: refresh the stat so the next run skips hashing
+            cache['stat'] = stat
+            write_cache(cache_file, cache)
+            return CachedContacts(cache['rows'], cache['contacts'], True)
+    else:
+        digest = file_hash(vcf_file_path)
+
+    rows = parse_vcf(vcf_file_path)
+    # Later cards win for a shared number, like loading contacts.csv row by row
+    contacts = {phone: full_name for _, _, full_name, phone in rows}
+    write_cache(cache_file, {
+        'version': CACHE_VERSION,
+        'source': os.path.abspath(vcf_file_path),
+        'stat': stat,
+        'sha256': digest,
+        'rows': rows,
+        'contacts': contacts,
+    })
+    return CachedContacts(rows, contacts, False)
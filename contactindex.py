@@ -0,0 +1,156 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from messageio import read_messages
+
+# Labeled export (labelmessages.py output, .csv or .parquet) and where its index is written
+messages_location = r"c:\Users\lndnc\Downloads\cleanedimessages.csv"
+index_dir = 'cleanedimessages.contactindex'
+
+INDEX_COLUMNS = ['Sender', 'To', 'Group Chat', 'Group Chat Name', 'Sent by Me']
+
+# name -> row positions (or chat codes) grouped per contact or chat; see build_contact_index
+POSTINGS = ['dm', 'group', 'contact_chats', 'chat_me', 'chat']
+
+def grouped(codes, values, size):
+    """Group values by code into one flat array plus offsets; code c owns values[offsets[c]:offsets[c + 1]].
+
+    The sort is stable, so row positions stay in export (time) order within each code.
+    """
+    order = np.argsort(codes, kind='stable')
+    return values[order], np.searchsorted(codes[order], np.arange(size + 1))
+
+def contact_postings(messages):
+    """Split a labeled message frame into per-contact and per-chat row lists in one pass.
+
+    Returns (postings, contacts, chats), where postings maps each name in POSTINGS to a
+    (values, offsets) pair from grouped and contacts/chats are the names behind the codes.
+    """
+    rows = np.arange(len(messages))
+    group = (messages['Group Chat'] == 1).to_numpy()
+    individual = (messages['Group Chat'] == 0).to_numpy()
+    sent = (messages['Sent by Me'] == 1).to_numpy()
+
+    # One contact vocabulary across To (DMs) and Sender (group chat messages from others)
+    to = messages['To'].astype(object)
+    sender = messages['Sender'].astype(object).where(~sent)
+    contact_codes, contacts = pd.factorize(pd.concat([to.where(to != ''), sender], ignore_index=True))
+    to_codes, sender_codes = contact_codes[:len(messages)], contact_codes[len(messages):]
+    chat_codes, chats = pd.factorize(messages['Group Chat Name'].astype(object))
+
+    dm = individual & (to_codes >= 0)
+    received_group = group & ~sent & (sender_codes >= 0)
+    my_group = group & sent & (chat_codes >= 0)
+    in_chat = chat_codes >= 0
+
+    # Distinct (contact, chat) pairs for the chats each contact has sent in
+    pair_mask = received_group & in_chat
+    pairs = np.unique(sender_codes[pair_mask].astype(np.int64) * max(len(chats), 1) + chat_codes[pair_mask])
+    pair_contacts, pair_chats = pairs // max(len(chats), 1), pairs % max(len(chats), 1)
+
+    postings = {
+        'dm': grouped(to_codes[dm], rows[dm], len(contacts)),
+        'group': grouped(sender_codes[received_group], rows[received_group], len(contacts)),
+        'contact_chats': grouped(pair_contacts, pair_chats, len(contacts)),
+        'chat_me': grouped(chat_codes[my_group], rows[my_group], len(chats)),
+        'chat': grouped(chat_codes[in_chat], rows[in_chat], len(chats)),
+    }
+    return postings, [str(contact) for contact in contacts], [str(chat) for chat in chats]
+
+def build_contact_index(messages_location, index_dir):
+    """Write the per-contact and per-chat row lists of a labeled export as a memory-mappable sidecar.
+
+    For every contact: the rows of our direct messages (dm), the group chat messages they sent
+    (group) and the group chats they sent them in (contact_chats). For every group chat: my
+    messages in it (chat_me) and all of its messages (chat). Each is stored as <name>.npy with
+    <name>_offsets.npy. Returns the number of contacts indexed.
+    """
+    messages = read_messages(messages_location, columns=INDEX_COLUMNS)
+    postings, contacts, chats = contact_postings(messages)
+
+    os.makedirs(index_dir, exist_ok=True)
+    for name, (values, offsets) in postings.items():
+        np.save(os.path.join(index_dir, f'{name}.npy'), values.astype(np.int64))
+        np.save(os.path.join(index_dir, f'{name}_offsets.npy'), offsets.astype(np.int64))
+    with open(os.path.join(index_dir, 'names.json'), 'w', encoding='utf-8') as f:
+        json.dump({'source': os.path.abspath(messages_location), 'rows': len(messages),
+                   'contacts': contacts, 'chats': chats}, f)
+    return len(contacts)
+
+class ContactIndex:
+    """Row lookups by contact and by group chat, from a sidecar or built in memory.
+
+    Each lookup is a slice, so the cost of a query depends only on how many messages it
+    returns. Row positions refer to the messages the index was built from.
+    """
+
+    def __init__(self, postings, rows, contacts, chats):
+        self.postings = postings
+        self.rows = rows
+        self.contacts = contacts
+        self.chats = chats
+        self.contact_codes = {contact: code for code, contact in enumerate(self.contacts)}
+        self.chat_codes = {chat: code for code, chat in enumerate(self.chats)}
+
+    @classmethod
+    def load(cls, index_dir):
+        """Open a sidecar written by build_contact_index, memory-mapping its arrays."""
+        postings = {}
+        for name in POSTINGS:
+            values = np.load(os.path.join(index_dir, f'{name}.npy'), mmap_mode='r')
+            offsets = np.load(os.path.join(index_dir, f'{name}_offsets.npy'), mmap_mode='r')
+            postings[name] = (values, offsets)
+        with open(os.path.join(index_dir, 'names.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(postings, meta['rows'], meta['contacts'], meta['chats'])
+
+    @classmethod
+    def from_messages(cls, messages):
+        """Build the index in memory from an already loaded labeled message frame."""
+        postings, contacts, chats = contact_postings(messages)
+        return cls(postings, len(messages), contacts, chats)
+
+    def _lookup(self, name, code):
+        values, offsets = self.postings[name]
+        if code is None:
+            return values[:0]
+        return values[offsets[code]:offsets[code + 1]]
+
+    def dm_rows(self, contact):
+        """Rows of the direct messages with contact."""
+        return self._lookup('dm', self.contact_codes.get(contact))
+
+    def group_rows(self, contact):
+        """Rows of the group chat messages contact sent."""
+        return self._lookup('group', self.contact_codes.get(contact))
+
+    def chats_of(self, contact):
+        """Names of the group chats contact has sent messages in."""
+        return [self.chats[code] for code in self._lookup('contact_chats', self.contact_codes.get(contact))]
+
+    def chat_rows(self, chat, mine=False):
+        """Rows of a group chat's messages, or only the ones I sent with mine=True."""
+        return self._lookup('chat_me' if mine else 'chat', self.chat_codes.get(chat))
+
+    def person_rows(self, contact):
+        """(DM rows, contact's group chat rows, my rows in the contact's group chats), each in export order."""
+        chat_codes = self._lookup('contact_chats', self.contact_codes.get(contact))
+        my_rows = [self._lookup('chat_me', int(code)) for code in chat_codes]
+        me_gc_rows = np.sort(np.concatenate(my_rows)) if my_rows else np.array([], dtype=np.int64)
+        return np.asarray(self.dm_rows(contact)), np.asarray(self.group_rows(contact)), me_gc_rows
+
+if __name__ == '__main__':
+    from analysisengine import MessageAnalysis
+
+    start = time.perf_counter()
+    print(f"{build_contact_index(messages_location, index_dir)} contacts indexed in {time.perf_counter() - start:.2f}s")
+
+    engine = MessageAnalysis.from_file(messages_location, contact_index_dir=index_dir)
+    start = time.perf_counter()
+    for contact in engine.contact_index.contacts:
+        engine.person_activity(contact, 10)
+    print(f"Person activity for {len(engine.contact_index.contacts)} contacts in {time.perf_counter() - start:.2f}s")
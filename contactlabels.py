@@ -0,0 +1,51 @@
+import csv
+import numpy as np
+import pandas as pd
+from phonenormalize import normalize_handle
+
+def load_contacts_dict(contacts_file):
+    """Load a contacts CSV (Full Name, Phone Number) into a dictionary mapping canonical phone keys to full names."""
+    contacts = {}
+    with open(contacts_file, 'r', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if row['Phone Number']:
+                contacts[normalize_handle(row['Phone Number'])] = row['Full Name']
+    return contacts
+
+def label_handles(messages, columns, contacts_dict):
+    """Replace handles with contact names in several columns at once, in place.
+
+    The columns are factorized together so each distinct handle is normalized and looked up
+    once, then the labels are broadcast back through the integer codes. Handles with no
+    contact and missing values are left unchanged.
+    """
+    stacked = pd.concat([messages[col].astype(object) for col in columns], ignore_index=True)
+    codes, uniques = pd.factorize(stacked)
+
+    labels = np.array([contacts_dict.get(normalize_handle(str(handle)), handle) for handle in uniques] + [np.nan], dtype=object)
+    labeled = labels[codes]  # Code -1 (missing) picks the trailing NaN
+
+    n = len(messages)
+    for i, col in enumerate(columns):
+        messages[col] = labeled[i * n:(i + 1) * n]
+    return messages
+
+def to_analysis_frame(batch):
+    """Shape a labeled export batch like labelmessages.py output, the layout analysisengine expects.
+
+    Messages I sent get Sender "Me", Group Chat becomes a 0/1 flag (group chat identifiers
+    start with "chat"), and To holds the contact for direct messages and '' for group chats.
+    Empty Group Chat Names (DMs and unnamed group chats) become missing, as they read back from CSV.
+    """
+    frame = batch.rename(columns={'Contact Identifier': 'To'})
+    frame['Readable Time'] = pd.to_datetime(frame['Readable Time'])
+    # Plain object columns so "Me" and '' can be assigned even if the input was categorical
+    frame['Sender'] = frame['Sender'].astype(object)
+    frame['To'] = frame['To'].astype(object)
+    frame['Group Chat'] = frame['Group Chat'].astype(object).fillna('').astype(str).str.startswith('chat').astype('int8')
+    frame['Sent by Me'] = frame['Sent by Me'].fillna(0).astype('int8')
+    chat_names = frame['Group Chat Name'].astype(object)
+    frame['Group Chat Name'] = chat_names.where(chat_names != '')
+    frame.loc[frame['Sent by Me'] == 1, 'Sender'] = 'Me'
+    frame.loc[frame['Group Chat'] == 1, 'To'] = ''
+    return frame
@@ -1,10 +1,6 @@
 import csv
-import re
-import pandas as pd
-
-def clean_phone_number(phone):
-    """Clean up the phone number by removing spaces, hyphens, and parentheses."""
-    return re.sub(r'[\s\-\(\)]', '', phone)
+from messageio import read_messages, write_messages
+from phonenormalize import normalize_handle, normalize_series
 
 def load_contacts(contacts_file):
     """Load contacts from a CSV file into a dictionary mapping cleaned phone numbers to full names."""
@@ -12,11 +8,11 @@ def load_contacts(contacts_file):
     with open(contacts_file, 'r', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
-            cleaned_phone = clean_phone_number(row['Phone Number'])
+            cleaned_phone = normalize_handle(row['Phone Number'])
             contacts[cleaned_phone] = row['Full Name']
     return contacts
 
-# File paths
+# File paths (paths ending in .parquet are read and written as typed Parquet)
 imes_loc = r"/Users/landon/Desktop/ai proj/imessages_export.csv"
 conts_loc = r"/Users/landon/Desktop/ai proj/contacts.csv"
 final_save = r"/Users/landon/Desktop/ai proj/actuallylabeledmessages.csv"
@@ -25,16 +21,16 @@ final_save = r"/Users/landon/Desktop/ai proj/actuallylabeledmessages.csv"
 contacts_dict = load_contacts(conts_loc)
 
 # Load iMessage export into a DataFrame
-dataframe = pd.read_csv(imes_loc)
+dataframe = read_messages(imes_loc)
 
 # Clean the Sender column and map to contact names
-dataframe['Cleaned Sender'] = dataframe['Sender'].apply(clean_phone_number)
+dataframe['Cleaned Sender'] = normalize_series(dataframe['Sender'])
 dataframe['Sender'] = dataframe['Cleaned Sender'].map(contacts_dict).fillna('Unknown')
 
 # Drop the temporary Cleaned Sender column
 dataframe.drop(columns=['Cleaned Sender'], inplace=True)
 
 # Save the updated DataFrame to a new CSV file
-dataframe.to_csv(final_save, index=False, encoding='utf-8')
+write_messages(dataframe, final_save)
 
 print(f"Updated iMessage data saved to {final_save}")
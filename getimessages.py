@@ -1,42 +1,215 @@
 import sqlite3
 import csv
+import json
+import os
+import time
+from contactlabels import load_contacts_dict
+from messageio import clear_parts, export_schema, is_parquet, open_export_writer, rows_to_record_batch
+from phonenormalize import normalize_handle
+from timeindex import build_time_index
 
-# Path to your chat.db file
+# Path to your chat.db file, or the indexed local copy built by mirror.py
 db_path = r'/Users/landon/Library/Messages/chat.db'
+# Use a path ending in .parquet for a typed columnar export instead of CSV
+output_file = 'imessages_export.csv'
 
-# Connect to the database in read-only mode
-conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
-cursor = conn.cursor()
+# Number of rows pulled from the cursor and written to the CSV at a time
+batch_size = 50000
 
-# Query to get messages with readable timestamps, group chat info, sender info, and contact name
-cursor.execute('''
+# Only export messages newer than the last run and append them to output_file
+incremental = False
+# Sidecar file holding the highest message ROWID and date already exported
+state_file = 'imessages_export.state.json'
+
+# Contacts CSV from vcftocsv.py; when set, senders are exported as contact names directly
+contacts_file = None
+
+# Directory for a memory-mapped time/contact index of the export (see timeindex.py); None skips it
+time_index_dir = None
+
+EXPORT_COLUMNS = ['Timestamp', 'Readable Time', 'Sender', 'Sender ID', 'Message', 'Group Chat', 'Group Chat Name', 'Sent by Me', 'Contact Identifier']
+
+# Joins every export and SQL-side analysis reads messages through; {contact_join} is filled in
+# by build_export_query. Each message appears exactly once: messages without a handle (handle_id 0,
+# e.g. my own group chat messages) are kept, and a message linked to several chats is attributed
+# to the lowest chat ROWID instead of being repeated once per chat. The chat lookup uses chat.db's
+# index on chat_message_join.message_id (mirror.py builds the same one).
+EXPORT_FROM = '''
+    FROM message
+    LEFT JOIN handle ON message.handle_id = handle.ROWID{contact_join}
+    LEFT JOIN chat ON chat.ROWID = (
+        SELECT MIN(chat_message_join.chat_id) FROM chat_message_join
+        WHERE chat_message_join.message_id = message.ROWID
+    )'''
+
+# Query to get messages with readable timestamps, group chat info, sender info, and contact name.
+# {handle_name}, {extra_columns} and {contact_join} are filled in by build_export_query.
+EXPORT_QUERY = '''
     SELECT
         message.date / 1000000000 + strftime('%s', '2001-01-01') AS timestamp,
         datetime(message.date / 1000000000 + strftime('%s', '2001-01-01'), 'unixepoch', 'localtime') AS readable_time,
-        handle.id AS sender,
+        {handle_name} AS sender,
         handle.ROWID AS sender_id,
         message.text,
         chat.chat_identifier AS group_chat,
         chat.display_name AS group_chat_name,
         message.is_from_me AS sent_by_me,
-        handle.id AS contact_identifier  -- This field is the phone number or email of the contact
-    FROM message
-    JOIN handle ON message.handle_id = handle.ROWID
-    LEFT JOIN chat_message_join ON message.ROWID = chat_message_join.message_id
-    LEFT JOIN chat ON chat_message_join.chat_id = chat.ROWID
+        -- contact_identifier is the phone number or email of the contact
+        {handle_name} AS contact_identifier{extra_columns}''' + EXPORT_FROM + '''
+    WHERE message.ROWID > ? AND message.ROWID <= ?
     ORDER BY message.date ASC;
-''')
+'''
+
+# Resolve handles to contact names through the tables created by attach_contacts
+LABELED_HANDLE_NAME = 'COALESCE(contact_names.full_name, handle.id)'
+CONTACT_JOIN = '''
+    LEFT JOIN labels.handle_keys ON handle_keys.handle_rowid = handle.ROWID
+    LEFT JOIN labels.contact_names ON contact_names.phone_key = handle_keys.phone_key'''
+
+def build_export_query(labeled=False, guid=False):
+    """Return the export query, optionally joining contact names onto the sender and contact identifier.
+
+    With guid=True each row ends with the message GUID, which identifies a message across databases.
+    """
+    extra_columns = ',\n        message.guid AS guid' if guid else ''
+    if labeled:
+        return EXPORT_QUERY.format(handle_name=LABELED_HANDLE_NAME, extra_columns=extra_columns, contact_join=CONTACT_JOIN)
+    return EXPORT_QUERY.format(handle_name='handle.id', extra_columns=extra_columns, contact_join='')
+
+def attach_contacts(conn, contacts):
+    """Load a canonical phone key -> full name mapping into an attached in-memory database.
+
+    Every chat.db handle gets its canonical key computed once here, so the export query can
+    resolve names with plain joins on the small handle_keys and contact_names tables.
+    """
+    conn.execute("ATTACH DATABASE ':memory:' AS labels")
+    conn.execute('CREATE TABLE labels.contact_names (phone_key TEXT PRIMARY KEY, full_name TEXT NOT NULL)')
+    conn.execute('CREATE TABLE labels.handle_keys (handle_rowid INTEGER PRIMARY KEY, phone_key TEXT NOT NULL)')
+    conn.executemany('INSERT INTO labels.contact_names VALUES (?, ?)', contacts.items())
+    handles = conn.execute('SELECT ROWID, id FROM handle WHERE id IS NOT NULL').fetchall()
+    conn.executemany('INSERT INTO labels.handle_keys VALUES (?, ?)', ((rowid, normalize_handle(handle_id)) for rowid, handle_id in handles))
+
+def dedup_report(conn, first_rowid, last_rowid):
+    """Count the rows the one-row-per-message joins recover and collapse for a ROWID range.
+
+    'handle-less messages kept' were dropped by the old inner JOIN on handle, and
+    'duplicate chat rows removed' were the extra copies of messages linked to several chats.
+    """
+    handleless = conn.execute('''
+        SELECT COUNT(*) FROM message LEFT JOIN handle ON message.handle_id = handle.ROWID
+        WHERE handle.ROWID IS NULL AND message.ROWID > ? AND message.ROWID <= ?
+    ''', (first_rowid, last_rowid)).fetchone()[0]
+    fan_out = conn.execute('''
+        SELECT COUNT(*) - COUNT(DISTINCT message_id) FROM chat_message_join
+        WHERE message_id > ? AND message_id <= ?
+    ''', (first_rowid, last_rowid)).fetchone()[0]
+    return {'handle-less messages kept': handleless, 'duplicate chat rows removed': fan_out}
+
+def connect_readonly(db_path):
+    """Open chat.db in read-only mode so the Messages app's database is never modified."""
+    return sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+
+def iter_batches(cursor, batch_size=batch_size):
+    """Yield lists of up to batch_size rows from an executed cursor until it is exhausted."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+def load_state(state_file):
+    """Load the export watermark from the sidecar state file, or start from zero if there is none."""
+    if not os.path.exists(state_file):
+        return {'last_rowid': 0, 'last_date': 0}
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state_file, state):
+    """Write the export watermark to the sidecar state file."""
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+
+def read_watermark(conn):
+    """Return the highest message ROWID and date currently in chat.db."""
+    max_rowid, max_date = conn.execute('SELECT MAX(ROWID), MAX(date) FROM message').fetchone()
+    return {'last_rowid': max_rowid or 0, 'last_date': max_date or 0}
+
+def log_progress(batches):
+    """Pass batches through unchanged while printing the running row count and rows per second."""
+    start = time.perf_counter()
+    total_rows = 0
+    for rows in batches:
+        yield rows
+        total_rows += len(rows)
+        elapsed = time.perf_counter() - start
+        print(f"{total_rows} rows exported ({total_rows / elapsed:,.0f} rows/s)")
+
+def write_csv(batches, output_file, append=False):
+    """Write row batches to a CSV file, appending without a header if requested, and return the row count."""
+    total_rows = 0
+    # Save to CSV with UTF-8 encoding and double quote escaping
+    with open(output_file, 'a' if append else 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, quoting=csv.QUOTE_ALL)
+        if not append:
+            writer.writerow(EXPORT_COLUMNS)
+        for rows in batches:
+            writer.writerows(rows)
+            total_rows += len(rows)
+    return total_rows
+
+def write_parquet(batches, output_dir, first_rowid, append=False):
+    """Write row batches as typed record batches into a new Parquet part file and return the row count."""
+    schema = export_schema()
+    if not append:
+        clear_parts(output_dir)
+    total_rows = 0
+    writer = open_export_writer(output_dir, first_rowid, schema)
+    for rows in batches:
+        writer.write_batch(rows_to_record_batch(rows, schema))
+        total_rows += len(rows)
+    writer.close()
+    return total_rows
+
+def export_messages(db_path, output_file, batch_size=batch_size, incremental=False, state_file=state_file, contacts_file=None, time_index_dir=None):
+    """Stream the message export one batch at a time and return the number of rows written.
+
+    An output_file ending in .parquet is written as a directory of typed Parquet part files,
+    anything else as CSV. With incremental=True only messages above the ROWID watermark in
+    state_file are exported and appended, and the watermark is advanced once they are written.
+    With a contacts_file, Sender and Contact Identifier are resolved to contact names inside
+    the query (unknown handles are kept), so no separate labeling pass is needed.
+    Every message is written exactly once; see EXPORT_FROM and dedup_report.
+    With a time_index_dir, the export's time index is rebuilt once the rows are written.
+    """
+    conn = connect_readonly(db_path)
+    if contacts_file:
+        attach_contacts(conn, load_contacts_dict(contacts_file))
+    cursor = conn.cursor()
+
+    # Fix the upper bound before exporting so messages arriving mid-run are picked up next time
+    resume = incremental and os.path.exists(state_file) and os.path.exists(output_file)
+    previous = load_state(state_file) if resume else {'last_rowid': 0, 'last_date': 0}
+    current = read_watermark(conn)
+    cursor.execute(build_export_query(labeled=bool(contacts_file)), (previous['last_rowid'], current['last_rowid']))
 
-# Fetch all rows
-rows = cursor.fetchall()
+    # Only one batch of rows is held in memory at a time
+    batches = log_progress(iter_batches(cursor, batch_size))
+    if is_parquet(output_file):
+        total_rows = write_parquet(batches, output_file, previous['last_rowid'] + 1, append=resume)
+    else:
+        total_rows = write_csv(batches, output_file, append=resume)
 
-# Save to CSV with UTF-8 encoding and double quote escaping
-with open('imessages_export.csv', 'w', newline='', encoding='utf-8') as csvfile:
-    writer = csv.writer(csvfile, quoting=csv.QUOTE_ALL)
-    writer.writerow(['Timestamp', 'Readable Time', 'Sender', 'Sender ID', 'Message', 'Group Chat', 'Group Chat Name', 'Sent by Me', 'Contact Identifier'])
-    writer.writerows(rows)
+    for rule, count in dedup_report(conn, previous['last_rowid'], current['last_rowid']).items():
+        print(f"{rule}: {count}")
 
-# Close the connection
-conn.close()
+    conn.close()
+    save_state(state_file, current)
+    if time_index_dir:
+        build_time_index(output_file, time_index_dir)
+    return total_rows
 
-print("Messages with group chat info, contact identifier, and sent status exported to imessages_export.csv")
+if __name__ == '__main__':
+    export_messages(db_path, output_file, batch_size, incremental, state_file, contacts_file, time_index_dir)
+    print(f"Messages with group chat info, contact identifier, and sent status exported to {output_file}")
@@ -1,11 +1,14 @@
 import pandas as pd
+from messageio import read_messages, write_messages
+from contactlabels import label_handles
+from phonenormalize import normalize_series
 
-# Load data
+# Load data (paths ending in .parquet are read and written as typed Parquet)
 messages_location = r"c:\Users\lndnc\Downloads\all_chat_data.csv"
 contacts_location = r"c:\Users\lndnc\Downloads\contacts.csv"
 save = r"c:\Users\lndnc\Downloads\cleanedimessages.csv"
 
-messages = pd.read_csv(messages_location)
+messages = read_messages(messages_location)
 contacts = pd.read_csv(contacts_location)
 
 print(messages.shape)
@@ -13,27 +16,21 @@ print(messages.columns)
 print(contacts.shape)
 print(contacts.columns)
 
-def add_plus_prefix(number):
-    number = str(number)  
-    if number[0].isdigit() and not number.startswith('+'):
-        return '+' + number
-    return number
-
-
-contacts['Phone Number'] = contacts['Phone Number'].astype(str).apply(add_plus_prefix)
-messages['Sender'] = messages['Sender'].astype(str).apply(add_plus_prefix)
+# Normalize each distinct handle once to the shared canonical key
+contacts['Phone Number'] = normalize_series(contacts['Phone Number'].astype(str))
+messages['Sender'] = normalize_series(messages['Sender'].astype(str))
 
 contacts_dict = dict(zip(contacts['Phone Number'], contacts['Full Name']))
 
-messages['Sender'] = messages['Sender'].replace(contacts_dict)
-messages['Contact Identifier'] = messages['Contact Identifier'].replace(contacts_dict)
+# Map each distinct handle in both columns to its contact name once (unknown handles stay as they are)
+label_handles(messages, ['Sender', 'Contact Identifier'], contacts_dict)
 messages.rename(columns={'Contact Identifier': 'To'}, inplace=True)
 
 messages.loc[messages['Group Chat'] == 1, 'To'] = ''
 
 messages
 
-messages.to_csv(save, index=False)
+write_messages(messages, save)
 
 print(messages.head())
 
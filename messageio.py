@@ -0,0 +1,128 @@
+import glob
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # CSV still works without pyarrow, only .parquet paths need it
+    pa = None
+
+# Columns that repeat a few hundred distinct values across millions of rows
+CATEGORY_COLUMNS = ['Sender', 'To', 'Group Chat Name', 'Contact Identifier']
+# 0/1 columns stored as int8 instead of int64
+FLAG_COLUMNS = ['Sent by Me', 'Group Chat']
+TIME_COLUMN = 'Readable Time'
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def is_parquet(path):
+    """Return True if the path should be read or written as Parquet instead of CSV."""
+    return str(path).endswith('.parquet')
+
+def require_pyarrow():
+    """Raise a helpful error if pyarrow is needed but not installed."""
+    if pa is None:
+        raise ImportError("pyarrow is required to read or write .parquet files (pip install pyarrow)")
+
+def export_schema():
+    """Arrow schema for the raw getimessages.py export."""
+    require_pyarrow()
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('Timestamp', pa.int64()),
+        ('Readable Time', pa.timestamp('s')),
+        ('Sender', dict_string),
+        ('Sender ID', pa.int64()),
+        ('Message', pa.string()),
+        ('Group Chat', dict_string),
+        ('Group Chat Name', dict_string),
+        ('Sent by Me', pa.int8()),
+        ('Contact Identifier', dict_string),
+    ])
+
+def rows_to_record_batch(rows, schema):
+    """Convert a list of row tuples from the SQLite cursor into a typed Arrow record batch."""
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        elif pa.types.is_timestamp(field.type):
+            arrays.append(pc.strptime(pa.array(values, type=pa.string()), format=TIME_FORMAT, unit='s'))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def open_export_writer(output_dir, first_rowid, schema):
+    """Open a Parquet writer for one export run as a new part file inside output_dir.
+
+    Each run writes its own part so incremental exports can be appended without rewriting
+    history; pd.read_parquet on the directory reads every part back as one frame.
+    """
+    require_pyarrow()
+    os.makedirs(output_dir, exist_ok=True)
+    part_path = os.path.join(output_dir, f'part-{first_rowid:012d}.parquet')
+    return pq.ParquetWriter(part_path, schema, compression='zstd')
+
+def clear_parts(output_dir):
+    """Remove the part files from a previous full Parquet export."""
+    for part_path in glob.glob(os.path.join(output_dir, 'part-*.parquet')):
+        os.remove(part_path)
+
+def parse_times(values):
+    """Parse Readable Time strings, using the export's fixed format when it matches."""
+    try:
+        return pd.to_datetime(values, format=TIME_FORMAT)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values)
+
+def compact_dtypes(df):
+    """Cast known columns to categorical, int8 and datetime64 dtypes in place and return the frame.
+
+    Flag columns holding text (the raw export's Group Chat is the chat identifier) become
+    categoricals instead.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in FLAG_COLUMNS:
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].fillna(0).astype('int8')
+        elif not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    if TIME_COLUMN in df.columns and not pd.api.types.is_datetime64_any_dtype(df[TIME_COLUMN]):
+        df[TIME_COLUMN] = parse_times(df[TIME_COLUMN])
+    return df
+
+def write_messages(df, path):
+    """Save a message frame as typed, compressed Parquet or as CSV depending on the path."""
+    if is_parquet(path):
+        require_pyarrow()
+        compact_dtypes(df.copy()).to_parquet(path, index=False, compression='zstd')
+    else:
+        df.to_csv(path, index=False, encoding='utf-8')
+
+def read_messages(path, columns=None):
+    """Load a message export into a memory-compact frame.
+
+    Sender/To/chat names become categoricals, the 0/1 flags int8 and Readable Time datetime64.
+    columns limits the load to the ones the caller needs (missing ones are skipped), so
+    analyses that never look at Message text do not pay for it.
+    """
+    if is_parquet(path):
+        require_pyarrow()
+        if columns is not None:
+            available = pq.ParquetDataset(path).schema.names
+            columns = [col for col in columns if col in available]
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        if columns is not None:
+            available = pd.read_csv(path, nrows=0).columns
+            columns = [col for col in columns if col in available]
+        # Categorical columns are built while parsing instead of as object strings first
+        dtype = {col: 'category' for col in CATEGORY_COLUMNS}
+        df = pd.read_csv(path, usecols=columns, dtype=dtype)
+    return compact_dtypes(df)
@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import time
+
+# Path to your chat.db file
+db_path = r'/Users/landon/Library/Messages/chat.db'
+# Local copy of the tables the export reads; point getimessages.py and sqlanalysis.py at it
+mirror_path = 'chat_mirror.db'
+
+# Same table and column names as chat.db, limited to the columns the export and analyses read
+MIRROR_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS handle (ROWID INTEGER PRIMARY KEY, id TEXT, service TEXT);
+    CREATE TABLE IF NOT EXISTS chat (ROWID INTEGER PRIMARY KEY, guid TEXT, style INTEGER, chat_identifier TEXT, display_name TEXT);
+    CREATE TABLE IF NOT EXISTS message (ROWID INTEGER PRIMARY KEY, guid TEXT, text TEXT, handle_id INTEGER, date INTEGER, is_from_me INTEGER);
+    CREATE TABLE IF NOT EXISTS chat_message_join (chat_id INTEGER, message_id INTEGER, PRIMARY KEY (chat_id, message_id));
+'''
+
+# Built after the first bulk load, which is faster than maintaining them row by row
+MIRROR_INDEXES = '''
+    CREATE INDEX IF NOT EXISTS message_date ON message (date);
+    CREATE INDEX IF NOT EXISTS message_handle_id ON message (handle_id);
+    CREATE INDEX IF NOT EXISTS message_is_from_me ON message (is_from_me, date);
+    CREATE INDEX IF NOT EXISTS chat_message_join_message_id ON chat_message_join (message_id);
+    CREATE INDEX IF NOT EXISTS chat_message_join_chat_id ON chat_message_join (chat_id);
+'''
+
+def mirror_chat_db(db_path, mirror_path=mirror_path):
+    """Copy new messages from chat.db into the indexed local mirror and return how many were added.
+
+    chat.db is attached read-only and copied with INSERT ... SELECT, so the copy runs inside
+    SQLite in one pass. Messages and their chat links are appended above the mirror's highest
+    message ROWID; handle and chat are small and refreshed in full so renamed chats carry over.
+    """
+    conn = sqlite3.connect(f'file:{mirror_path}', uri=True)
+    conn.executescript(MIRROR_SCHEMA)
+    conn.execute('ATTACH DATABASE ? AS src', (f'file:{db_path}?mode=ro',))
+
+    last_rowid = conn.execute('SELECT COALESCE(MAX(ROWID), 0) FROM message').fetchone()[0]
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO handle SELECT ROWID, id, service FROM src.handle')
+        conn.execute('INSERT OR REPLACE INTO chat SELECT ROWID, guid, style, chat_identifier, display_name FROM src.chat')
+        added = conn.execute('''
+            INSERT INTO message
+            SELECT ROWID, guid, text, handle_id, date, is_from_me FROM src.message WHERE ROWID > ?
+        ''', (last_rowid,)).rowcount
+        conn.execute('''
+            INSERT OR IGNORE INTO chat_message_join
+            SELECT chat_id, message_id FROM src.chat_message_join WHERE message_id > ?
+        ''', (last_rowid,))
+
+    conn.execute('DETACH DATABASE src')
+
+    conn.executescript(MIRROR_INDEXES)
+    if last_rowid == 0:
+        # Give the query planner statistics for the new indexes
+        conn.execute('ANALYZE')
+    conn.close()
+    return added
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    existed = os.path.exists(mirror_path)
+    added = mirror_chat_db(db_path, mirror_path)
+    print(f"{'Refreshed' if existed else 'Created'} {mirror_path}: {added} new messages in {time.perf_counter() - start:.2f}s")
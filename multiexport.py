@@ -0,0 +1,106 @@
+import heapq
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from contactlabels import load_contacts_dict
+from getimessages import attach_contacts, batch_size, build_export_query, connect_readonly, iter_batches, read_watermark, write_csv, write_parquet
+from messageio import is_parquet
+
+# chat.db files to export together, e.g. several people's databases or backups of one device
+db_paths = [
+    r'/Users/landon/Library/Messages/chat.db',
+]
+# Use a path ending in .parquet for a typed columnar export instead of CSV
+output_file = 'imessages_merged_export.csv'
+# Contacts CSV from vcftocsv.py; when set, senders are exported as contact names directly
+contacts_file = None
+# Number of databases exported at once (None uses one process per CPU)
+workers = None
+
+def spool_export(db_path, spool_path, batch_size=batch_size, contacts_file=None):
+    """Export one database in date order to a spool file of pickled row batches and return the row count.
+
+    Rows are the usual export columns followed by the message GUID.
+    """
+    conn = connect_readonly(db_path)
+    if contacts_file:
+        attach_contacts(conn, load_contacts_dict(contacts_file))
+    cursor = conn.execute(build_export_query(labeled=bool(contacts_file), guid=True), (0, read_watermark(conn)['last_rowid']))
+    total_rows = 0
+    with open(spool_path, 'wb') as f:
+        for rows in iter_batches(cursor, batch_size):
+            pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+            total_rows += len(rows)
+    conn.close()
+    return total_rows
+
+def read_spool(spool_path):
+    """Yield the rows of a spool file one at a time, holding one batch in memory."""
+    with open(spool_path, 'rb') as f:
+        while True:
+            try:
+                rows = pickle.load(f)
+            except EOFError:
+                return
+            yield from rows
+
+def unique_by_guid(rows, stats):
+    """Drop rows whose message GUID was already seen and strip the GUID column.
+
+    The rows arrive in timestamp order and copies of a message share its date, so only the
+    GUIDs of the current second have to be remembered.
+    """
+    current_timestamp, seen = None, set()
+    for row in rows:
+        timestamp, guid = row[0], row[-1]
+        if timestamp != current_timestamp:
+            current_timestamp, seen = timestamp, set()
+        if guid in seen:
+            stats['duplicates'] += 1
+            continue
+        seen.add(guid)
+        yield row[:-1]
+
+def batched(rows, batch_size=batch_size):
+    """Regroup a row iterator into lists of up to batch_size rows for the export writers."""
+    rows = iter(rows)
+    return iter(lambda: list(itertools.islice(rows, batch_size)), [])
+
+def export_merged(db_paths, output_file, batch_size=batch_size, contacts_file=None, workers=workers):
+    """Export several databases in parallel and merge them into one time-ordered export.
+
+    Each database is exported by its own worker process to a temporary spool file, so the
+    export phase takes as long as the slowest database. The spools are then k-way merged on
+    Timestamp and messages present in more than one database are written once. Returns the
+    number of rows written.
+    """
+    spool_dir = tempfile.mkdtemp(prefix='imessages_spool_', dir=os.path.dirname(os.path.abspath(output_file)))
+    try:
+        spool_paths = [os.path.join(spool_dir, f'{i}.spool') for i in range(len(db_paths))]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(spool_export, db_paths, spool_paths, itertools.repeat(batch_size), itertools.repeat(contacts_file)))
+        for path, count in zip(db_paths, counts):
+            print(f"{count} rows exported from {path}")
+
+        stats = {'duplicates': 0}
+        merged = heapq.merge(*(read_spool(spool_path) for spool_path in spool_paths), key=lambda row: row[0])
+        batches = batched(unique_by_guid(merged, stats), batch_size)
+        if is_parquet(output_file):
+            total_rows = write_parquet(batches, output_file, 1)
+        else:
+            total_rows = write_csv(batches, output_file)
+    finally:
+        shutil.rmtree(spool_dir)
+
+    print(f"{stats['duplicates']} duplicate messages removed by GUID")
+    return total_rows
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    total_rows = export_merged(db_paths, output_file, batch_size, contacts_file, workers)
+    print(f"{total_rows} messages from {len(db_paths)} databases exported to {output_file} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,51 @@
+import functools
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # Only normalize_arrow needs pyarrow
+    pa = None
+
+# Formatting characters dropped from phone numbers in one str.translate call
+FORMATTING_CHARS = str.maketrans('', '', ' \t\n\xa0-().')
+
+@functools.lru_cache(maxsize=None)
+def normalize_handle(handle):
+    """Return the canonical E.164-style key for a phone number or email handle.
+
+    Formatting characters are removed, bare numbers of up to 10 digits are treated as US
+    numbers (+1...), longer bare numbers get a leading '+', and emails are lowercased.
+    Anything else (names, 'Me', ...) is returned with only surrounding whitespace removed.
+    Results are memoized because a few hundred handles repeat across millions of rows.
+    """
+    handle = handle.strip()
+    if '@' in handle:
+        return handle.lower()
+    number = handle.translate(FORMATTING_CHARS)
+    if number.startswith('+') and number[1:].isdigit():
+        return number
+    if number.isdigit():
+        return ('+1' if len(number) <= 10 else '+') + number
+    return handle
+
+def normalize_series(series):
+    """Normalize a whole pandas Series of handles, cleaning each distinct value only once.
+
+    Missing values stay missing and the result is an object Series aligned with the input.
+    """
+    codes, uniques = pd.factorize(series)
+    normalized = np.array([normalize_handle(str(value)) for value in uniques] + [np.nan], dtype=object)
+    # Code -1 (missing) picks the trailing NaN
+    return pd.Series(normalized[codes], index=series.index, name=series.name)
+
+def normalize_arrow(array):
+    """Normalize an Arrow array of handles, returning a dictionary-encoded array of canonical keys."""
+    if pa is None:
+        raise ImportError("pyarrow is required for normalize_arrow (pip install pyarrow)")
+    if isinstance(array, pa.ChunkedArray):
+        return pa.chunked_array([normalize_arrow(chunk) for chunk in array.chunks])
+    if not pa.types.is_dictionary(array.type):
+        array = array.dictionary_encode()
+    dictionary = pa.array([normalize_handle(value) for value in array.dictionary.to_pylist()], type=pa.string())
+    return pa.DictionaryArray.from_arrays(array.indices, dictionary)
@@ -0,0 +1,163 @@
+import csv
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory is then not reported
+    resource = None
+
+from analysisengine import MessageAnalysis
+from contactcache import load_cached_contacts
+from contactlabels import load_contacts_dict, to_analysis_frame
+from getimessages import EXPORT_COLUMNS, attach_contacts, build_export_query, connect_readonly, dedup_report, iter_batches, read_watermark
+from messageio import clear_parts, compact_dtypes, export_schema, is_parquet, open_export_writer, rows_to_record_batch
+from report import build_chart_specs, render_report
+
+# Path to your chat.db file
+db_path = r'/Users/landon/Library/Messages/chat.db'
+# Contacts come from the vCard file (cached, see contactcache.py) or from a contacts CSV
+vcf_file = r"/Users/landon/Downloads/Fuller Adams and 290 others.vcf"
+contacts_file = None
+batch_size = 50000
+
+# Optional checkpoint of the labeled export (.csv or .parquet); None keeps everything in memory
+checkpoint_file = None
+# Optional directory for a headless chart report (see report.py); None only computes the analyses
+report_dir = None
+
+def peak_memory_mb():
+    """Peak resident memory of this process so far in MB, or None if it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+class StageTimer:
+    """Accumulates wall time and peak memory growth per pipeline stage.
+
+    Streaming stages run interleaved batch by batch, so each stage adds up the time spent
+    inside its own `with timer.stage(name):` blocks. The process peak only ever rises, so a
+    stage is charged with how much the peak rose while one of its blocks was running.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.peak_growth_mb = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        peak_before = peak_memory_mb()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+            if peak_before is not None:
+                growth = peak_memory_mb() - peak_before
+                self.peak_growth_mb[name] = self.peak_growth_mb.get(name, 0.0) + growth
+
+    def report(self):
+        """Print one line per stage plus the total and the process peak memory."""
+        for name, seconds in self.seconds.items():
+            growth = self.peak_growth_mb.get(name)
+            memory = f", peak memory +{growth:,.0f} MB" if growth is not None else ''
+            print(f"{name:>10}: {seconds:7.2f}s{memory}")
+        peak = peak_memory_mb()
+        memory = f", peak memory {peak:,.0f} MB" if peak is not None else ''
+        print(f"{'total':>10}: {sum(self.seconds.values()):7.2f}s{memory}")
+
+def load_contacts(vcf_file=None, contacts_file=None):
+    """Phone -> name mapping from the cached vCard index or a contacts CSV (empty if neither is given)."""
+    if vcf_file:
+        return load_cached_contacts(vcf_file).contacts
+    if contacts_file:
+        return load_contacts_dict(contacts_file)
+    return {}
+
+def export_stage(conn, timer, batch_size=batch_size):
+    """Yield labeled row batches straight from the SQLite cursor (names are joined in the query)."""
+    with timer.stage('export'):
+        last_rowid = read_watermark(conn)['last_rowid']
+        cursor = conn.execute(build_export_query(labeled=True), (0, last_rowid))
+        batches = iter_batches(cursor, batch_size)
+    while True:
+        with timer.stage('export'):
+            rows = next(batches, None)
+        if rows is None:
+            break
+        yield rows
+    for rule, count in dedup_report(conn, 0, last_rowid).items():
+        print(f"{rule}: {count}")
+
+def checkpoint_stage(batches, path, timer):
+    """Write each batch to an intermediate .csv or .parquet file on its way through."""
+    if is_parquet(path):
+        schema = export_schema()
+        clear_parts(path)
+        writer = open_export_writer(path, 1, schema)
+        write_batch = lambda rows: writer.write_batch(rows_to_record_batch(rows, schema))
+        close = writer.close
+    else:
+        csvfile = open(path, 'w', newline='', encoding='utf-8')
+        writer = csv.writer(csvfile, quoting=csv.QUOTE_ALL)
+        writer.writerow(EXPORT_COLUMNS)
+        write_batch = writer.writerows
+        close = csvfile.close
+    try:
+        for rows in batches:
+            with timer.stage('checkpoint'):
+                write_batch(rows)
+            yield rows
+    finally:
+        close()
+
+def label_stage(batches, timer):
+    """Turn each row batch into an analysis-ready DataFrame (see contactlabels.to_analysis_frame)."""
+    for rows in batches:
+        with timer.stage('label'):
+            frame = to_analysis_frame(pd.DataFrame.from_records(rows, columns=EXPORT_COLUMNS))
+        yield frame
+
+def run_pipeline(db_path, vcf_file=None, contacts_file=None, batch_size=batch_size, checkpoint_file=None, report_dir=None):
+    """Run export -> label -> analyze in one pass over chat.db and return (engine, timer).
+
+    Batches stream from the cursor through labeling without touching disk unless a
+    checkpoint_file is given; the analysis engine is built once all batches have arrived.
+    """
+    timer = StageTimer()
+
+    with timer.stage('contacts'):
+        contacts = load_contacts(vcf_file, contacts_file)
+        conn = connect_readonly(db_path)
+        attach_contacts(conn, contacts)
+
+    batches = export_stage(conn, timer, batch_size)
+    if checkpoint_file:
+        batches = checkpoint_stage(batches, checkpoint_file, timer)
+    frames = list(label_stage(batches, timer))
+    conn.close()
+
+    with timer.stage('analyze'):
+        if not frames:
+            frames = [to_analysis_frame(pd.DataFrame(columns=EXPORT_COLUMNS))]
+        messages = compact_dtypes(pd.concat(frames, ignore_index=True))
+        del frames
+        engine = MessageAnalysis(messages)
+        # Compute every analysis the report uses (memoized on the engine)
+        build_chart_specs(engine)
+
+    if report_dir:
+        with timer.stage('report'):
+            render_report(engine, report_dir)
+
+    return engine, timer
+
+if __name__ == '__main__':
+    engine, timer = run_pipeline(db_path, vcf_file, contacts_file, batch_size, checkpoint_file, report_dir)
+    print(f"{len(engine.messages)} messages processed")
+    timer.report()
@@ -0,0 +1,122 @@
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend so no window is ever opened
+import matplotlib.pyplot as plt
+
+import charts
+from analysisengine import MessageAnalysis
+
+messages_location = r"c:\Users\lndnc\Downloads\cleanedimessages.csv"
+report_dir = 'report'
+# Any matplotlib savefig formats, e.g. ('png', 'svg')
+formats = ('png',)
+# Worker processes used to render charts (None = one per CPU)
+workers = None
+
+# Same settings as analysis.py
+groupingsize = 10
+timegroup = 20
+topnumGC = 30
+# Rank participation over every group chat; topnumGC only limits how many are plotted
+participation_all_chats = True
+contactstolookat = 30
+targetGC = "XC Juniors"
+target = "Augie Bunting"
+
+def build_chart_specs(engine):
+    """Compute every analysis once in this process and return (name, title, plot function, args) per chart.
+
+    Only the small result tables are sent to the workers, so the messages are never reloaded.
+    engine can also be an aggregatestore.AggregateStore, which has no per-person timeline.
+    """
+    time_activity = engine.time_of_day_activity(timegroup)
+    specs = [
+        ('lifetime_activity', 'Lifetime activity', charts.plot_lifetime_activity,
+         (engine.lifetime_activity(groupingsize), groupingsize)),
+        ('sent_activity', 'Sent messages', charts.plot_sent_activity,
+         (engine.sent_activity(groupingsize)['Sent'], groupingsize)),
+        ('time_of_day_sent_received', 'Time of day (sent vs. received)', charts.plot_time_of_day_sent_received,
+         (time_activity, timegroup)),
+        ('time_of_day_total', 'Time of day (all messages)', charts.plot_time_of_day_total,
+         (time_activity, timegroup)),
+        ('time_of_day_sent', 'Time of day (sent messages)', charts.plot_time_of_day_sent,
+         (time_activity, timegroup)),
+        ('participation_rates', 'Group chat participation', charts.plot_participation_rates,
+         (engine.participation_rates(topnumGC, participation_all_chats).head(topnumGC), topnumGC)),
+        ('top_group_chats', 'Top group chats', charts.plot_top_group_chats,
+         (engine.top_group_chats(topnumGC)['Number of Messages'], topnumGC)),
+        ('top_dm_contacts', 'Top contacts by direct messages', charts.plot_top_dm_contacts,
+         (engine.top_dm_contacts(contactstolookat)['Total Messages'], contactstolookat)),
+        ('total_interactions', 'Top contacts by total interactions', charts.plot_total_interactions,
+         (engine.total_interactions(contactstolookat), contactstolookat)),
+        ('group_chat_senders', f'Senders in {targetGC}', charts.plot_group_chat_senders,
+         (engine.group_chat_senders(targetGC)['Number of Messages'], targetGC)),
+    ]
+    if hasattr(engine, 'person_activity'):
+        specs.append(('person_activity', f'Activity with {target}', charts.plot_person_activity,
+                      (engine.person_activity(target, groupingsize), target, groupingsize)))
+    return specs
+
+def render_chart(name, plot_function, args, output_dir, formats):
+    """Draw one chart and save it in each format, returning the file names written."""
+    fig = plot_function(*args)
+    filenames = []
+    for fmt in formats:
+        filename = f'{name}.{fmt}'
+        fig.savefig(os.path.join(output_dir, filename))
+        filenames.append(filename)
+    plt.close(fig)
+    return filenames
+
+def write_index(output_dir, rendered):
+    """Write an index.html linking every rendered chart in report order."""
+    index_path = os.path.join(output_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>iMessage report</title></head><body>\n')
+        f.write('<h1>iMessage report</h1>\n')
+        for title, filenames in rendered:
+            f.write(f'<h2>{html.escape(title)}</h2>\n')
+            f.write(f'<img src="{html.escape(filenames[0])}" alt="{html.escape(title)}">\n')
+            links = ' '.join(f'<a href="{html.escape(name)}">{html.escape(name)}</a>' for name in filenames)
+            f.write(f'<p>{links}</p>\n')
+        f.write('</body></html>\n')
+    return index_path
+
+def render_report(engine, output_dir=report_dir, formats=formats, workers=workers):
+    """Render every chart to files in parallel worker processes and return the index file path.
+
+    Charts with no data (e.g. a targetGC or target that is not in the messages) are skipped and
+    a chart that fails to draw is reported, so the remaining charts and the index are still written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    specs = []
+    for name, title, plot_function, args in build_chart_specs(engine):
+        if len(args[0]) == 0:
+            print(f"Skipping {title}: no messages")
+        else:
+            specs.append((name, title, plot_function, args))
+
+    # Charts are independent, so each one is drawn in its own worker
+    rendered = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            (title, pool.submit(render_chart, name, plot_function, args, output_dir, formats))
+            for name, title, plot_function, args in specs
+        ]
+        for title, future in futures:
+            try:
+                rendered.append((title, future.result()))
+            except Exception as error:
+                print(f"Could not render {title}: {error!r}")
+
+    return write_index(output_dir, rendered)
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    engine = MessageAnalysis.from_file(messages_location)
+    index_path = render_report(engine, report_dir, formats, workers)
+    print(f"Report written to {index_path} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,98 @@
+import time
+
+import pandas as pd
+
+from analysisengine import time_of_day_segments
+from contactcache import load_cached_contacts
+from getimessages import EXPORT_FROM, CONTACT_JOIN, LABELED_HANDLE_NAME, attach_contacts, connect_readonly
+
+# Path to your chat.db file, or the indexed local copy built by mirror.py
+db_path = r'/Users/landon/Library/Messages/chat.db'
+vcf_file = r"/Users/landon/Downloads/Fuller Adams and 290 others.vcf"
+
+# Same rule as contactlabels.to_analysis_frame: group chat identifiers start with "chat", and
+# messages without a chat count as direct messages
+IS_GROUP = "COALESCE(chat.chat_identifier, '') LIKE 'chat%'"
+LOCAL_DAY = "date(message.date / 1000000000 + strftime('%s', '2001-01-01'), 'unixepoch', 'localtime')"
+LOCAL_MINUTE = "CAST(strftime('%H', message.date / 1000000000 + strftime('%s', '2001-01-01'), 'unixepoch', 'localtime') AS INTEGER) * 60 + CAST(strftime('%M', message.date / 1000000000 + strftime('%s', '2001-01-01'), 'unixepoch', 'localtime') AS INTEGER)"
+HAS_CHAT_NAME = "chat.display_name IS NOT NULL AND chat.display_name != ''"
+
+class SQLAnalysis:
+    """Runs the count-only analyses as GROUP BY queries directly against chat.db.
+
+    Only the small result tables leave SQLite, so summary views skip the export entirely.
+    Results have the same shape as analysisengine.MessageAnalysis for the methods provided.
+    """
+
+    def __init__(self, db_path, contacts=None):
+        self.conn = connect_readonly(db_path)
+        attach_contacts(self.conn, contacts or {})
+        self.from_clause = EXPORT_FROM.format(contact_join=CONTACT_JOIN)
+
+    def close(self):
+        self.conn.close()
+
+    def _read(self, select, where='1', group_by='', order_by='', params=()):
+        query = f'SELECT {select} {self.from_clause} WHERE {where} {group_by} {order_by}'
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    def _interval_counts(self, sent, groupingsize):
+        """Per-day counts for sent (1) or received (0) messages summed into groupingsize-day intervals."""
+        daily = self._read(f'{LOCAL_DAY} AS day, COUNT(*) AS count', where='message.is_from_me = ?',
+                           group_by='GROUP BY day', order_by='ORDER BY day', params=(sent,))
+        daily_counts = pd.Series(daily['count'].to_numpy(), index=pd.to_datetime(daily['day']))
+        return daily_counts.resample(f'{groupingsize}D').sum()
+
+    def lifetime_activity(self, groupingsize=10):
+        """Sent, received and total message counts in groupingsize-day intervals."""
+        activity_df = pd.DataFrame({
+            'Sent': self._interval_counts(1, groupingsize),
+            'Received': self._interval_counts(0, groupingsize),
+        }).fillna(0)
+        activity_df['Total'] = activity_df['Sent'] + activity_df['Received']
+        return activity_df
+
+    def sent_activity(self, groupingsize=10):
+        """Sent message counts in groupingsize-day intervals."""
+        return self._interval_counts(1, groupingsize).to_frame('Sent')
+
+    def top_group_chats(self, topnumGC=30):
+        """The topnumGC group chats by number of messages."""
+        counts = self._read('chat.display_name AS "Group Chat Name", COUNT(*) AS "Number of Messages"',
+                            where=f'{IS_GROUP} AND {HAS_CHAT_NAME}', group_by='GROUP BY chat.display_name',
+                            order_by='ORDER BY 2 DESC LIMIT ?', params=(topnumGC,))
+        return counts.set_index('Group Chat Name')
+
+    def top_dm_contacts(self, contactstolookat=30):
+        """The contactstolookat contacts by number of direct messages."""
+        # Messages without a handle have no contact, which the engine leaves out as a missing To
+        counts = self._read(f'{LABELED_HANDLE_NAME} AS "Contact", COUNT(*) AS "Total Messages"',
+                            where=f'NOT {IS_GROUP} AND handle.ROWID IS NOT NULL', group_by='GROUP BY 1',
+                            order_by='ORDER BY 2 DESC LIMIT ?', params=(contactstolookat,))
+        return counts.set_index('Contact')
+
+    def participation_rates(self, topnumGC=30, all_chats=False):
+        """Share of each group chat's messages sent by me, highest first."""
+        rates = self._read('chat.display_name AS "Group Chat Name", AVG(message.is_from_me = 1) AS "Participation Rate"',
+                           where=f'{IS_GROUP} AND {HAS_CHAT_NAME}', group_by='GROUP BY chat.display_name')
+        if not all_chats:
+            rates = rates[rates['Group Chat Name'].isin(self.top_group_chats(topnumGC).index)]
+        return rates.sort_values(by='Participation Rate', ascending=False).reset_index(drop=True)
+
+    def time_of_day_activity(self, timegroup=20):
+        """Sent, received and total message counts for every timegroup-minute segment of the day."""
+        counts = self._read(f'({LOCAL_MINUTE}) / ? AS segment, SUM(message.is_from_me = 1) AS sent, SUM(message.is_from_me = 0) AS received, COUNT(*) AS total',
+                            group_by='GROUP BY segment', params=(timegroup,))
+        counts = counts.set_index('segment').reindex(range(0, -(-24 * 60 // timegroup)), fill_value=0)
+        return pd.DataFrame({'Sent': counts['sent'].to_numpy(), 'Received': counts['received'].to_numpy(),
+                             'Total': counts['total'].to_numpy()}, index=time_of_day_segments(timegroup))
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    analysis = SQLAnalysis(db_path, load_cached_contacts(vcf_file).contacts if vcf_file else None)
+    print(analysis.lifetime_activity(10))
+    print(analysis.top_group_chats(30))
+    print(analysis.top_dm_contacts(30))
+    print(analysis.participation_rates(30))
+    analysis.close()
+    print(f"Summary computed in SQLite in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,116 @@
+import datetime
+import itertools
+import os
+import random
+import sqlite3
+
+# Apple's Messages dates count nanoseconds from 2001-01-01
+APPLE_EPOCH = datetime.datetime(2001, 1, 1)
+
+SCHEMA = '''
+    CREATE TABLE handle (ROWID INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, country TEXT, service TEXT NOT NULL, uncanonicalized_id TEXT);
+    CREATE TABLE chat (ROWID INTEGER PRIMARY KEY AUTOINCREMENT, guid TEXT UNIQUE NOT NULL, style INTEGER, chat_identifier TEXT, service_name TEXT, display_name TEXT);
+    CREATE TABLE message (ROWID INTEGER PRIMARY KEY AUTOINCREMENT, guid TEXT UNIQUE NOT NULL, text TEXT, handle_id INTEGER DEFAULT 0, service TEXT, date INTEGER, is_from_me INTEGER DEFAULT 0, cache_roomnames TEXT);
+    CREATE TABLE chat_handle_join (chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE, handle_id INTEGER REFERENCES handle (ROWID) ON DELETE CASCADE, UNIQUE(chat_id, handle_id));
+    CREATE TABLE chat_message_join (chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE, message_id INTEGER REFERENCES message (ROWID) ON DELETE CASCADE, message_date INTEGER DEFAULT 0, PRIMARY KEY (chat_id, message_id));
+    CREATE INDEX chat_message_join_idx_message_id_only ON chat_message_join (message_id);
+'''
+
+WORDS = ('ok', 'lol', 'yeah', 'see you soon', 'what time', 'sounds good', 'on my way', 'haha', 'nice',
+         'did you see that', 'running late', 'thanks!', 'call me', 'tomorrow?', 'for sure', 'omw')
+
+# Relative message volume for each hour of the day (quiet at night, busy in the evening)
+HOUR_WEIGHTS = [2, 1, 1, 1, 1, 1, 2, 4, 6, 6, 6, 7, 8, 7, 7, 7, 8, 9, 10, 11, 12, 11, 8, 4]
+
+def phone_number(i):
+    """The i-th synthetic US phone number in E.164 form."""
+    return f'+1555{i // 10000 % 1000:03d}{i % 10000:04d}'
+
+def zipf_cum_weights(n, s=1.1):
+    """Cumulative Zipf weights so a few contacts and chats get most of the messages."""
+    return list(itertools.accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+def apple_date(moment):
+    """Convert a datetime to chat.db's nanoseconds since 2001-01-01."""
+    return int((moment - APPLE_EPOCH).total_seconds()) * 1_000_000_000
+
+def generate_chat_db(db_path, messages=100_000, contacts=300, group_chats=40, years=5, seed=0,
+                     group_share=0.35, sent_share=0.45, batch_size=100_000):
+    """Build a chat.db with the tables and columns the exporter reads, filled with skewed synthetic traffic.
+
+    Contacts and group chats follow a Zipf distribution, timestamps follow HOUR_WEIGHTS over
+    the last `years` years, and my own group chat messages have handle_id 0 like real data.
+    """
+    rng = random.Random(seed)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.executescript(SCHEMA)
+
+    conn.executemany('INSERT INTO handle (ROWID, id, country, service) VALUES (?, ?, ?, ?)',
+                     ((i, phone_number(i), 'us', 'iMessage') for i in range(1, contacts + 1)))
+
+    # One DM chat per contact, then the group chats
+    conn.executemany('INSERT INTO chat (ROWID, guid, style, chat_identifier, service_name, display_name) VALUES (?, ?, 45, ?, ?, ?)',
+                     ((i, f'iMessage;-;{phone_number(i)}', phone_number(i), 'iMessage', '') for i in range(1, contacts + 1)))
+    members = {}
+    for g in range(group_chats):
+        chat_id = contacts + 1 + g
+        members[chat_id] = rng.sample(range(1, contacts + 1), k=min(contacts, rng.randint(2, 12)))
+        conn.execute('INSERT INTO chat (ROWID, guid, style, chat_identifier, service_name, display_name) VALUES (?, ?, 43, ?, ?, ?)',
+                     (chat_id, f'iMessage;+;chat{100000 + g}', f'chat{100000 + g}', 'iMessage', f'Group Chat {g + 1}'))
+        conn.executemany('INSERT INTO chat_handle_join VALUES (?, ?)', ((chat_id, h) for h in members[chat_id]))
+
+    contact_weights = zipf_cum_weights(contacts)
+    group_weights = zipf_cum_weights(group_chats) if group_chats else None
+    end = datetime.datetime(2024, 1, 1)
+    start_day = end - datetime.timedelta(days=365 * years)
+    total_days = 365 * years
+
+    def message_rows():
+        # Dates are generated in order so ROWID order matches date order, as in a real chat.db
+        day_step = total_days / max(messages, 1)
+        for rowid in range(1, messages + 1):
+            day = start_day + datetime.timedelta(days=int(rowid * day_step))
+            hour = rng.choices(range(24), weights=HOUR_WEIGHTS)[0]
+            moment = day + datetime.timedelta(hours=hour, minutes=rng.randrange(60), seconds=rng.randrange(60))
+            is_from_me = int(rng.random() < sent_share)
+            if group_chats and rng.random() < group_share:
+                chat_id = contacts + 1 + rng.choices(range(group_chats), cum_weights=group_weights)[0]
+                handle_id = 0 if is_from_me else rng.choice(members[chat_id])
+            else:
+                handle_id = rng.choices(range(1, contacts + 1), cum_weights=contact_weights)[0]
+                chat_id = handle_id
+            date = apple_date(moment)
+            yield (rowid, f'SYNTH-{rowid:010d}', rng.choice(WORDS), handle_id, 'iMessage', date, is_from_me), (chat_id, rowid, date)
+
+    rows = message_rows()
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        conn.executemany('INSERT INTO message (ROWID, guid, text, handle_id, service, date, is_from_me) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         (message for message, _ in batch))
+        conn.executemany('INSERT INTO chat_message_join VALUES (?, ?, ?)', (join for _, join in batch))
+        conn.commit()
+    conn.close()
+
+def generate_vcf(vcf_path, contacts=300, coverage=0.9, seed=0):
+    """Write a .vcf with a card for most of the synthetic contacts, numbers formatted like an address book."""
+    rng = random.Random(seed)
+    with open(vcf_path, 'w', encoding='utf-8', newline='') as f:
+        for i in range(1, contacts + 1):
+            if rng.random() > coverage:
+                continue
+            digits = phone_number(i)[2:]
+            f.write('BEGIN:VCARD\r\nVERSION:3.0\r\n')
+            f.write(f'N:Last{i};First{i};;;\r\nFN:First{i} Last{i}\r\n')
+            f.write(f'item1.TEL;type=pref:({digits[:3]}) {digits[3:6]}-{digits[6:]}\r\n')
+            f.write('END:VCARD\r\n')
+
+if __name__ == '__main__':
+    generate_chat_db('synthetic_chat.db', messages=100_000)
+    generate_vcf('synthetic_contacts.vcf')
+    print("Synthetic chat.db and contacts written to synthetic_chat.db and synthetic_contacts.vcf")
@@ -0,0 +1,33 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from analysisengine import MessageAnalysis
+from contactlabels import to_analysis_frame
+from getimessages import EXPORT_COLUMNS
+
+# A DM, a named group chat and an unnamed group chat, as the export rows come out of chat.db
+ROWS = [
+    (0, '2024-01-01 09:00:00', '+15550100001', 1, 'hi', '+15550100001', '', 0, 'Ada'),
+    (1, '2024-01-01 09:05:00', 'Me', 0, 'hey', '+15550100001', '', 1, 'Ada'),
+    (2, '2024-01-01 10:00:00', '+15550100002', 2, 'lunch?', 'chat111', 'Lunch', 0, 'Grace'),
+    (3, '2024-01-01 10:01:00', 'Me', 0, 'yes', 'chat111', 'Lunch', 1, 'Grace'),
+    (4, '2024-01-01 11:00:00', '+15550100003', 3, 'who is this', 'chat222', '', 0, 'Alan'),
+    (5, '2024-01-01 11:01:00', 'Me', 0, 'me', 'chat222', '', 1, 'Alan'),
+]
+
+def analysis_frame():
+    return to_analysis_frame(pd.DataFrame.from_records(ROWS, columns=EXPORT_COLUMNS))
+
+def test_empty_chat_names_become_missing():
+    frame = analysis_frame()
+    assert frame['Group Chat'].tolist() == [0, 0, 1, 1, 1, 1]
+    assert frame['Group Chat Name'].isna().tolist() == [True, True, False, False, True, True]
+    assert frame['To'].tolist() == ['Ada', 'Ada', '', '', '', '']
+
+def test_unnamed_group_chat_is_not_counted_as_a_chat():
+    engine = MessageAnalysis(analysis_frame())
+    assert engine.top_group_chats(30)['Number of Messages'].to_dict() == {'Lunch': 2}
+    rates = engine.participation_rates(30, all_chats=True)
+    assert rates.set_index('Group Chat Name')['Participation Rate'].to_dict() == {'Lunch': 0.5}
+    assert engine.top_dm_contacts(30)['Total Messages'].to_dict() == {'Ada': 2}
@@ -0,0 +1,30 @@
+import pytest
+
+vobject = pytest.importorskip('vobject')
+
+from vcfparse import contact_rows, parse_vcf
+
+# Mixed-case boundaries, a folded FN and an escaped comma, as some exporters write them
+CARDS = (
+    'BEGIN:VCARD\r\nVERSION:3.0\r\nFN:Ada Lovelace\r\nTEL;TYPE=CELL:(555) 010-0001\r\nEND:VCARD\r\n'
+    'begin:vcard\r\nversion:3.0\r\nfn:Grace Hopper\r\ntel:555-010-0002\r\ntel:555-010-0003\r\nend:vcard\r\n'
+    'Begin:VCard\r\nVersion:3.0\r\nFN:Alan\r\n  Turing\\, OBE\r\nTEL:+44 20 7946 0004\r\nEnd:VCard\r\n'
+)
+
+def serial_vobject_rows(path):
+    """Rows from reading the whole file with vobject in one pass, as vcftocsv.py does."""
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for vcard in vobject.readComponents(f.read()):
+            if hasattr(vcard, 'fn'):
+                phones = [tel.value for tel in vcard.tel_list] if hasattr(vcard, 'tel') else []
+                rows.extend(contact_rows(vcard.fn.value, phones))
+    return rows
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_parse_vcf_matches_serial_vobject(tmp_path, fast):
+    path = tmp_path / 'contacts.vcf'
+    path.write_bytes(CARDS.encode('utf-8'))
+    rows = parse_vcf(str(path), workers=1, fast=fast)
+    assert len(rows) == 4
+    assert rows == serial_vobject_rows(str(path))
@@ -0,0 +1,127 @@
+import sqlite3
+import time
+
+import pandas as pd
+
+from getimessages import attach_contacts, build_export_query, connect_readonly, iter_batches, read_watermark
+from messageio import TIME_FORMAT
+
+# Location of the search index
+search_path = 'imessage_search.sqlite'
+
+# Messages live in a plain table with the columns the filters use; message_text is an FTS5 index
+# over its text column (external content, so the text is stored only once)
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY, guid TEXT UNIQUE, timestamp INTEGER, readable_time TEXT, sender TEXT,
+        text TEXT, chat TEXT, chat_name TEXT, sent_by_me INTEGER, contact TEXT
+    );
+    CREATE INDEX IF NOT EXISTS messages_time ON messages (readable_time);
+    CREATE INDEX IF NOT EXISTS messages_contact ON messages (contact, readable_time);
+    CREATE INDEX IF NOT EXISTS messages_chat_name ON messages (chat_name, readable_time);
+    CREATE VIRTUAL TABLE IF NOT EXISTS message_text USING fts5(
+        text, content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    );
+'''
+
+RESULT_COLUMNS = {'readable_time': 'Readable Time', 'sender': 'Sender', 'contact': 'Contact Identifier',
+                  'chat_name': 'Group Chat Name', 'sent_by_me': 'Sent by Me', 'text': 'Message'}
+
+def phrase(text):
+    """Quote text as one FTS5 phrase, so punctuation and keywords like OR are matched literally."""
+    return '"' + text.replace('"', '""') + '"'
+
+class MessageSearch:
+    """Full-text index over message text with contact, chat and date filters.
+
+    Queries use FTS5 syntax: "see you soon" for a phrase, tomorr* for a prefix, and AND/OR/NOT
+    to combine them. New messages are added incrementally from chat.db like aggregatestore.py.
+    """
+
+    def __init__(self, path=search_path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def add_rows(self, rows):
+        """Index export rows that end with the message GUID (see build_export_query(guid=True)).
+
+        Messages already indexed are skipped by GUID. Returns the number of messages added.
+        """
+        last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM messages').fetchone()[0]
+        with self.conn:
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO messages (timestamp, readable_time, sender, text, chat, chat_name, sent_by_me, contact, guid)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (row[:3] + row[4:] for row in rows))
+            return self.conn.execute(
+                'INSERT INTO message_text (rowid, text) SELECT id, text FROM messages WHERE id > ?', (last_id,)
+            ).rowcount
+
+    def update_from_chat_db(self, db_path, contacts=None, batch_size=50000):
+        """Index only the messages added to chat.db since the last update and return how many were added.
+
+        The highest message ROWID already indexed is kept in the index itself.
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_rowid'").fetchone()
+        last_rowid = row[0] if row else 0
+
+        conn = connect_readonly(db_path)
+        attach_contacts(conn, contacts or {})
+        current = read_watermark(conn)
+        cursor = conn.execute(build_export_query(labeled=True, guid=True), (last_rowid, current['last_rowid']))
+        total_rows = sum(self.add_rows(rows) for rows in iter_batches(cursor, batch_size))
+        conn.close()
+
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_rowid', ?)", (current['last_rowid'],))
+        return total_rows
+
+    def search(self, query, contact=None, chat=None, start=None, end=None, limit=50):
+        """Best matches for an FTS5 query, optionally limited to one contact, one group chat and [start, end).
+
+        contact matches the Contact Identifier column (a name when contacts were given to the
+        update), chat the group chat name; start and end take anything pd.Timestamp accepts.
+        """
+        where = ['message_text MATCH ?']
+        params = [query]
+        if contact is not None:
+            where.append('messages.contact = ?')
+            params.append(contact)
+        if chat is not None:
+            where.append('messages.chat_name = ?')
+            params.append(chat)
+        if start is not None:
+            where.append('messages.readable_time >= ?')
+            params.append(pd.Timestamp(start).strftime(TIME_FORMAT))
+        if end is not None:
+            where.append('messages.readable_time < ?')
+            params.append(pd.Timestamp(end).strftime(TIME_FORMAT))
+        params.append(limit)
+
+        results = pd.read_sql_query(f'''
+            SELECT {', '.join(f'messages.{column}' for column in RESULT_COLUMNS)}
+            FROM message_text JOIN messages ON messages.id = message_text.rowid
+            WHERE {' AND '.join(where)}
+            ORDER BY message_text.rank LIMIT ?''', self.conn, params=params)
+        return results.rename(columns=RESULT_COLUMNS)
+
+if __name__ == '__main__':
+    from contactcache import load_cached_contacts
+
+    db_path = r'/Users/landon/Library/Messages/chat.db'
+    vcf_file = r"/Users/landon/Downloads/Fuller Adams and 290 others.vcf"
+    query = phrase('see you soon') + ' OR tomorr*'
+
+    # Index only the messages added since the last run, then search
+    index = MessageSearch(search_path)
+    added = index.update_from_chat_db(db_path, load_cached_contacts(vcf_file).contacts if vcf_file else None)
+    print(f"{added} new messages added to {search_path}")
+    start = time.perf_counter()
+    results = index.search(query)
+    print(results.to_string(index=False))
+    print(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+    index.close()
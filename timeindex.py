@@ -0,0 +1,112 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from messageio import TIME_COLUMN, read_messages
+
+# Export (.csv or .parquet) to index and where its sidecar is written
+messages_location = 'imessages_export.csv'
+index_dir = 'imessages_export.timeindex'
+
+# Per-contact slices use the first of these columns the file has: the raw export's handle (or
+# name, when labeled at export) column, or To in labelmessages.py output
+CONTACT_COLUMNS = ['Contact Identifier', 'To']
+
+def to_seconds(moment):
+    """Convert a datetime-like value (string, datetime, pd.Timestamp) to the index's int64 seconds."""
+    return pd.Timestamp(moment).to_datetime64().astype('datetime64[s]').astype(np.int64)
+
+def build_time_index(messages_location, index_dir):
+    """Write the sorted time and per-contact arrays for an export as a memory-mappable sidecar.
+
+    times.npy/time_rows.npy hold every message's Readable Time (int64 seconds) in sorted order
+    with its row position in the export. contact_times.npy/contact_rows.npy hold the same sorted
+    by contact and then time, with contact_offsets.npy marking where each contact's run starts.
+    Messages without a time are left out. Returns the number of rows indexed.
+    """
+    available = read_messages(messages_location, columns=[TIME_COLUMN] + CONTACT_COLUMNS)
+    contact_column = next((col for col in CONTACT_COLUMNS if col in available.columns), None)
+
+    valid = available[TIME_COLUMN].notna().to_numpy()
+    times = available[TIME_COLUMN].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    rows = np.flatnonzero(valid)
+    order = np.argsort(times[rows], kind='stable')
+    time_rows = rows[order]
+
+    if contact_column is None:
+        contact_values = pd.Series(np.nan, index=available.index)
+    else:
+        # '' (To for group chat messages) is not a contact
+        contact_values = available[contact_column].astype(object)
+        contact_values = contact_values.where(contact_values != '')
+    codes, contacts = pd.factorize(contact_values)
+    contact_rows = np.flatnonzero(valid & (codes >= 0))
+    contact_rows = contact_rows[np.lexsort((times[contact_rows], codes[contact_rows]))]
+    contact_offsets = np.searchsorted(codes[contact_rows], np.arange(len(contacts) + 1))
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, 'times.npy'), times[time_rows])
+    np.save(os.path.join(index_dir, 'time_rows.npy'), time_rows)
+    np.save(os.path.join(index_dir, 'contact_times.npy'), times[contact_rows])
+    np.save(os.path.join(index_dir, 'contact_rows.npy'), contact_rows)
+    np.save(os.path.join(index_dir, 'contact_offsets.npy'), contact_offsets.astype(np.int64))
+    with open(os.path.join(index_dir, 'contacts.json'), 'w', encoding='utf-8') as f:
+        json.dump({'source': os.path.abspath(messages_location), 'rows': len(available),
+                   'contact_column': contact_column, 'contacts': [str(contact) for contact in contacts]}, f)
+    return len(time_rows)
+
+class TimeIndex:
+    """Answers date-range and per-contact queries on an export with binary search over its sidecar.
+
+    The arrays are memory-mapped, so opening the index reads nothing up front and every query
+    returns a view of the export row positions in time order, found with searchsorted.
+    Start bounds are inclusive and end bounds exclusive; None leaves a side open.
+    """
+
+    def __init__(self, index_dir):
+        load = lambda name: np.load(os.path.join(index_dir, name), mmap_mode='r')
+        self.times = load('times.npy')
+        self.time_rows = load('time_rows.npy')
+        self.contact_times = load('contact_times.npy')
+        self.contact_rows = load('contact_rows.npy')
+        self.contact_offsets = load('contact_offsets.npy')
+        with open(os.path.join(index_dir, 'contacts.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.source = meta['source']
+        self.contact_codes = {contact: code for code, contact in enumerate(meta['contacts'])}
+
+    def _bounds(self, times, start, end):
+        """Positions in a sorted times array covering [start, end)."""
+        lo = 0 if start is None else np.searchsorted(times, to_seconds(start), side='left')
+        hi = len(times) if end is None else np.searchsorted(times, to_seconds(end), side='left')
+        return lo, max(lo, hi)
+
+    def rows_between(self, start=None, end=None):
+        """Export row positions of the messages in [start, end), in time order."""
+        lo, hi = self._bounds(self.times, start, end)
+        return self.time_rows[lo:hi]
+
+    def rows_for_contact(self, contact, start=None, end=None):
+        """Export row positions of one contact's messages in [start, end), in time order."""
+        code = self.contact_codes.get(contact)
+        if code is None:
+            return self.contact_rows[:0]
+        first, last = self.contact_offsets[code], self.contact_offsets[code + 1]
+        lo, hi = self._bounds(self.contact_times[first:last], start, end)
+        return self.contact_rows[first + lo:first + hi]
+
+    def last_days(self, days, contact=None):
+        """Row positions of the messages in the last `days` days before the newest message."""
+        if not len(self.times):
+            return self.time_rows[:0]
+        start = pd.Timestamp(int(self.times[-1]), unit='s') - pd.Timedelta(days=days)
+        if contact is not None:
+            return self.rows_for_contact(contact, start=start)
+        return self.rows_between(start=start)
+
+if __name__ == '__main__':
+    print(f"{build_time_index(messages_location, index_dir)} messages indexed in {index_dir}")
+    index = TimeIndex(index_dir)
+    print(f"{len(index.last_days(30))} messages in the last 30 days")
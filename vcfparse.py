@@ -0,0 +1,116 @@
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import vobject
+from phonenormalize import normalize_handle
+
+# Cards handed to each worker process at a time
+cards_per_chunk = 2000
+
+# Card boundaries at the start of a line; property names are case-insensitive (RFC 6350)
+CARD_BEGIN = re.compile(rb'(?im)^begin:vcard')
+CARD_END = re.compile(rb'(?im)^end:vcard')
+
+# Property line: optional group ("item1."), name, optional ;params, then the value
+PROPERTY_LINE = re.compile(r'^(?:[\w-]+\.)?([\w-]+)((?:;[^:]*)?):(.*)$')
+TEXT_ESCAPES = re.compile(r'\\([\\,;nN])')
+# Parameters the line-based parser does not decode itself
+NEEDS_VOBJECT = re.compile(r'ENCODING=|CHARSET=', re.IGNORECASE)
+
+def card_offsets(vcf_file_path):
+    """Return (start, end) byte offsets of every BEGIN:VCARD ... END:VCARD block (in any case), read through a memory map."""
+    offsets = []
+    if os.path.getsize(vcf_file_path) == 0:  # mmap cannot map an empty file
+        return offsets
+    with open(vcf_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        begin = CARD_BEGIN.search(mm)
+        while begin:
+            end = CARD_END.search(mm, begin.end())
+            if not end:
+                break
+            offsets.append((begin.start(), end.end()))
+            begin = CARD_BEGIN.search(mm, end.end())
+    return offsets
+
+def contact_rows(full_name, phones):
+    """Build the (first name, last name, full name, phone) rows for one card, as vcf_to_csv writes them."""
+    full_name = full_name.strip()  # Clean whitespace from full name
+
+    # Skip entries without a full name
+    if not full_name:
+        return []
+
+    name_parts = full_name.split()
+
+    # Extract first and last names, ensuring there's no index error
+    first_name = name_parts[0] if name_parts else ''
+    last_name = name_parts[-1] if len(name_parts) > 1 else ''
+    return [(first_name, last_name, full_name, normalize_handle(phone)) for phone in phones]
+
+def unescape_text(value):
+    """Undo vCard text escaping of backslashes, commas, semicolons and newlines, as vobject does."""
+    return TEXT_ESCAPES.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+def parse_card_vobject(card_text):
+    """Parse one card with vobject."""
+    rows = []
+    for vcard in vobject.readComponents(card_text):
+        if hasattr(vcard, 'fn'):  # Check if the vCard has a full name
+            phones = [tel.value for tel in vcard.tel_list] if hasattr(vcard, 'tel') else []
+            rows.extend(contact_rows(vcard.fn.value, phones))
+    return rows
+
+def parse_card_fast(card_text):
+    """Parse FN and TEL from one card line by line, falling back to vobject for encoded values."""
+    # Unfold continuation lines (RFC 6350: a line starting with a space or tab continues the previous one)
+    lines = re.sub(r'\r?\n[ \t]', '', card_text).splitlines()
+
+    full_name = None
+    phones = []
+    for line in lines:
+        match = PROPERTY_LINE.match(line)
+        if not match:
+            continue
+        name, params, value = match.groups()
+        name = name.upper()
+        if name not in ('FN', 'TEL'):
+            continue
+        if NEEDS_VOBJECT.search(params):
+            return parse_card_vobject(card_text)
+        if name == 'FN' and full_name is None:
+            full_name = unescape_text(value)
+        elif name == 'TEL':
+            phones.append(unescape_text(value))
+
+    if full_name is None:
+        return []
+    return contact_rows(full_name, phones)
+
+def parse_chunk(vcf_file_path, offsets, fast=True):
+    """Parse a run of cards from the memory-mapped file and return their contact rows in file order."""
+    parse_card = parse_card_fast if fast else parse_card_vobject
+    rows = []
+    with open(vcf_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start, end in offsets:
+            rows.extend(parse_card(mm[start:end].decode('utf-8')))
+    return rows
+
+def parse_vcf(vcf_file_path, workers=None, fast=True):
+    """Parse every card in a .vcf file in a process pool and return the contact rows in file order.
+
+    The file is split on BEGIN:VCARD/END:VCARD boundaries and each worker maps the file itself,
+    so only byte offsets are sent between processes. With fast=False every card goes through
+    vobject; the fast line-based parser gives the same rows for plain FN/TEL values.
+    """
+    offsets = card_offsets(vcf_file_path)
+    chunks = [offsets[i:i + cards_per_chunk] for i in range(0, len(offsets), cards_per_chunk)]
+
+    # A single chunk is not worth starting worker processes for
+    if len(chunks) <= 1 or workers == 1:
+        return [row for chunk in chunks for row in parse_chunk(vcf_file_path, chunk, fast)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(parse_chunk, [vcf_file_path] * len(chunks), chunks, [fast] * len(chunks))
+        return [row for rows in results for row in rows]
@@ -1,17 +1,12 @@
 import csv
-import vobject
-import re
+import os
+from contactcache import load_cached_contacts
+from messageio import is_parquet, read_messages, write_messages
+from phonenormalize import normalize_handle, normalize_series
 
 def clean_phone_number(phone):
-    """Remove spaces, hyphens, and parentheses from the phone number and add '1' if too short."""
-    # Remove unwanted characters
-    cleaned_phone = re.sub(r'[\s\-\(\)]', '', phone)
-    
-    # Add '1' in front if the cleaned number is less than 10 digits
-    if len(cleaned_phone) <= 10:
-        cleaned_phone = '1' + cleaned_phone
-    
-    return cleaned_phone
+    """Normalize the phone number to the shared canonical key (see phonenormalize.normalize_handle)."""
+    return normalize_handle(phone)
 
 def load_contacts(contacts_file):
     """Load contacts from a CSV file and return a dictionary mapping cleaned phone numbers to full names."""
@@ -24,9 +19,10 @@ def load_contacts(contacts_file):
             contacts[cleaned_phone] = row['Full Name']
     return contacts
 
-def convert_senders_to_names(imessage_file, contacts_file, output_file):
+def convert_senders_to_names(imessage_file, contacts_file, output_file, contacts=None):
     """Convert sender phone numbers in iMessage data to corresponding full contact names."""
-    contacts = load_contacts(contacts_file)
+    if contacts is None:
+        contacts = load_contacts(contacts_file)
     
     with open(imessage_file, 'r', encoding='utf-8') as infile, open(output_file, 'w', newline='', encoding='utf-8') as outfile:
         reader = csv.DictReader(infile)
@@ -52,30 +48,32 @@ def convert_senders_to_names(imessage_file, contacts_file, output_file):
     
     print(f"iMessage data converted and saved to {output_file}")
 
-def vcf_to_csv(vcf_file_path, csv_file_path='contacts.csv'):
-    """Parse a vCard file and export to CSV format."""
-    # Step 1: Parse the vCard file and build a list of contacts
-    contacts_list = []
-    with open(vcf_file_path, 'r') as vcf_file:
-        for vcard in vobject.readComponents(vcf_file):
-            if hasattr(vcard, 'fn'):  # Check if the vCard has a full name
-                full_name = vcard.fn.value.strip()  # Clean whitespace from full name
-                
-                # Skip entries without a full name
-                if not full_name:
-                    continue
-                
-                name_parts = full_name.split()
-                
-                # Extract first and last names, ensuring there's no index error
-                first_name = name_parts[0] if name_parts else ''
-                last_name = name_parts[-1] if len(name_parts) > 1 else ''
+def convert_senders_to_names_columnar(imessage_file, contacts_file, output_file, contacts=None):
+    """Parquet version of convert_senders_to_names, mapping the distinct senders once on a typed frame."""
+    if contacts is None:
+        contacts = load_contacts(contacts_file)
+    messages = read_messages(imessage_file)
+
+    # Clean each distinct sender once and broadcast the names back over every row
+    cleaned = normalize_series(messages['Sender'])
+    messages['Sender'] = cleaned.map(contacts).fillna(cleaned)
+
+    columns = ['Timestamp', 'Readable Time', 'Sender', 'Message', 'Group Chat', 'Sent by Me']
+    write_messages(messages[columns], output_file)
+
+    print(f"iMessage data converted and saved to {output_file}")
+
+def vcf_to_csv(vcf_file_path, csv_file_path='contacts.csv', cache_file='contacts_cache.pickle'):
+    """Parse a vCard file and export to CSV format, returning the phone -> name mapping.
 
-                # Check if the vCard has a phone number
-                if hasattr(vcard, 'tel'):
-                    for tel in vcard.tel_list:
-                        phone = clean_phone_number(tel.value)  # Clean the phone number
-                        contacts_list.append((first_name, last_name, full_name, phone))
+    If the vCard file is unchanged since the last run (see contactcache) the cached contacts
+    are used and an existing CSV is left as it is.
+    """
+    # Step 1: Load the cached contacts, or parse the vCard file in parallel chunks
+    contacts_list, contacts, cache_hit = load_cached_contacts(vcf_file_path, cache_file)
+    if cache_hit and os.path.exists(csv_file_path):
+        print(f"Contacts unchanged, reusing {csv_file_path}")
+        return contacts
 
     # Step 2: Save to CSV
     with open(csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
@@ -84,15 +82,21 @@ def vcf_to_csv(vcf_file_path, csv_file_path='contacts.csv'):
         writer.writerows(contacts_list)
 
     print(f"Contacts exported to {csv_file_path}")
+    return contacts
 
-# File paths
-vcf_loc = r"/Users/landon/Downloads/Fuller Adams and 290 others.vcf"
-imes_loc = r"/Users/landon/Desktop/ai proj/imessages_export.csv"
-final_save = r"/Users/landon/Desktop/ai proj/actuallylabeledmessages.csv"
-conts_loc = r"/Users/landon/Desktop/ai proj/contacts.csv"
+# Guarded so the vCard worker processes can import this file without re-running it
+if __name__ == '__main__':
+    # File paths
+    vcf_loc = r"/Users/landon/Downloads/Fuller Adams and 290 others.vcf"
+    imes_loc = r"/Users/landon/Desktop/ai proj/imessages_export.csv"
+    final_save = r"/Users/landon/Desktop/ai proj/actuallylabeledmessages.csv"
+    conts_loc = r"/Users/landon/Desktop/ai proj/contacts.csv"
 
-# Convert vCard to CSV
-vcf_to_csv(vcf_loc, conts_loc)
+    # Convert vCard to CSV (skipped when the vCard file has not changed)
+    contacts = vcf_to_csv(vcf_loc, conts_loc)
 
-# Convert iMessage senders to contact names
-convert_senders_to_names(imes_loc, conts_loc, final_save)
+    # Convert iMessage senders to contact names (.parquet paths use the typed columnar format)
+    if is_parquet(imes_loc) or is_parquet(final_save):
+        convert_senders_to_names_columnar(imes_loc, conts_loc, final_save, contacts)
+    else:
+        convert_senders_to_names(imes_loc, conts_loc, final_save, contacts)